@@ -0,0 +1,306 @@
+"""軟體品質指標 HTTP/JSON API
+
+不啟動Streamlit即可取得與儀表板相同的資料: 專案摘要 (最新指標、品質評分、
+preflight筆數)、品質指標時間序列與模組覆蓋率。資料來自同一個Parquet儲存與
+rollup，計算使用utils/summaries.py (與app.py共用)。
+
+    - 每個回應帶有ETag (由端點、查詢參數、資料版本與專案配置版本計算)，
+      請求帶 If-None-Match 且資料未變動時直接回 304，不讀取任何資料
+    - 用戶端接受gzip時壓縮回應 (壓縮後的內容使用不同的ETag)
+    - 序列化後的回應保留在有上限的LRU快取中，同一版本的重複輪詢不重新計算
+    - 背景DataWatcher與儀表板相同，來源CSV變動時自動重新匯入並改變版本
+
+使用範例:
+    $ python api.py --port 8080
+    $ curl 'http://localhost:8080/api/summary?projects=project1,project2&start=2024-01-01&end=2024-06-30'
+    $ curl 'http://localhost:8080/api/timeseries?projects=project1&metrics=Pass_Rate(%),score&resolution=weekly'
+    $ curl 'http://localhost:8080/api/module_coverage?project=project1'
+
+端點:
+    GET /api/projects          專案清單與資料日期範圍
+    GET /api/summary           projects, start, end
+    GET /api/timeseries        projects, start, end, resolution, metrics
+    GET /api/module_coverage   project, start, end, resolution
+    GET /healthz               健康檢查
+    GET /metrics               Prometheus格式的效能指標
+"""
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+from collections import OrderedDict
+
+import pandas as pd
+from aiohttp import web
+
+from utils.data_store import date_bounds, list_projects
+from utils.data_watcher import DataWatcher
+from utils.logging_setup import setup_logging
+from utils.perf import prometheus_text, span
+from utils.project_config import config_version
+from utils.rollups import RESOLUTIONS, pick_resolution
+from utils.summaries import (
+    SUMMARY_METRICS, frame_records, module_coverage_series, project_summaries, quality_timeseries
+)
+
+# 保留的序列化回應數量上限
+RESPONSE_CACHE_ENTRIES = 128
+# 小於此大小的回應不壓縮 (bytes)
+GZIP_MIN_SIZE = 1024
+# 時間序列可選的欄位
+TIMESERIES_FIELDS = SUMMARY_METRICS + ['score', 'grade']
+
+WATCHER_KEY = web.AppKey('watcher', DataWatcher)
+CACHE_KEY = web.AppKey('response_cache', OrderedDict)
+
+
+def _error(status, message):
+    """建立JSON格式的錯誤回應例外"""
+    return status(
+        text=json.dumps({'error': message}, ensure_ascii=False),
+        content_type='application/json'
+    )
+
+
+def _split(value):
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+def _parse_projects(request, kind='qa'):
+    """解析projects參數 (逗號分隔)，未指定時為該資料種類的所有專案"""
+    available = list_projects(kind)
+    requested = _split(request.query.get('projects', ''))
+    if not requested:
+        return available
+    unknown = [project for project in requested if project not in available]
+    if unknown:
+        raise _error(web.HTTPNotFound, f"找不到專案: {', '.join(unknown)}")
+    return requested
+
+
+def _parse_date_range(request, projects, kind='qa'):
+    """解析start/end參數 (YYYY-MM-DD)，未指定的一端使用資料的最早/最晚日期"""
+    min_date, max_date = date_bounds(kind, projects)
+    try:
+        start = pd.Timestamp(request.query['start']) if 'start' in request.query else min_date
+        end = pd.Timestamp(request.query['end']) if 'end' in request.query else max_date
+    except ValueError as e:
+        raise _error(web.HTTPBadRequest, f"日期格式錯誤 (應為YYYY-MM-DD): {str(e)}")
+    if start is None or end is None:
+        return None
+    if start > end:
+        raise _error(web.HTTPBadRequest, "start 不可晚於 end")
+    return start, end
+
+
+def _parse_resolution(request, date_range):
+    """解析resolution參數，未指定時依時間跨度挑選 (與儀表板相同)"""
+    resolution = request.query.get('resolution')
+    if resolution is None:
+        return pick_resolution(*date_range) if date_range else 'daily'
+    if resolution not in RESOLUTIONS:
+        raise _error(web.HTTPBadRequest, f"resolution 必須是 {', '.join(RESOLUTIONS)} 之一")
+    return resolution
+
+
+def _day(value):
+    return value.strftime('%Y-%m-%d') if value is not None else None
+
+
+def _etag(request, kinds, projects):
+    """由端點、查詢參數、相關資料版本與專案配置版本計算ETag (不讀取資料)"""
+    watcher = request.app[WATCHER_KEY]
+    parts = [request.path, sorted(request.query.items())]
+    parts += [watcher.version(kind, projects) for kind in kinds]
+    parts.append(config_version(projects))
+    return hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()[:20]
+
+
+def _not_modified(request, tags):
+    """If-None-Match是否符合任一個ETag"""
+    header = request.headers.get('If-None-Match')
+    if not header:
+        return False
+    candidates = {tag.strip().removeprefix('W/') for tag in header.split(',')}
+    return '*' in candidates or any(f'"{tag}"' in candidates for tag in tags)
+
+
+def _accepts_gzip(request):
+    return any(
+        coding.split(';')[0].strip() == 'gzip'
+        for coding in request.headers.get('Accept-Encoding', '').split(',')
+    )
+
+
+async def _respond(request, name, kinds, projects, compute):
+    """以ETag/快取/gzip處理回應
+
+    Args:
+        request (aiohttp.web.Request): 請求
+        name (str): 端點名稱 (效能量測用)
+        kinds (list): 回應內容依賴的資料種類
+        projects (list): 回應內容依賴的專案
+        compute (callable): 產生可JSON序列化內容的函數，在執行緒池中執行
+    """
+    tag = _etag(request, kinds, projects)
+    gzip_tag = f'{tag}-gz'
+    headers = {'Cache-Control': 'no-cache', 'Vary': 'Accept-Encoding'}
+    use_gzip = _accepts_gzip(request)
+    if _not_modified(request, (tag, gzip_tag)):
+        headers['ETag'] = f'"{gzip_tag if use_gzip else tag}"'
+        return web.Response(status=304, headers=headers)
+
+    cache = request.app[CACHE_KEY]
+    entry = cache.get(tag)
+    if entry is None:
+        def build():
+            with span(f'api:{name}'):
+                body = json.dumps(compute(), ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+                compressed = gzip.compress(body, compresslevel=6) if len(body) >= GZIP_MIN_SIZE else None
+            return body, compressed
+
+        entry = await asyncio.get_running_loop().run_in_executor(None, build)
+        cache[tag] = entry
+        while len(cache) > RESPONSE_CACHE_ENTRIES:
+            cache.popitem(last=False)
+    else:
+        cache.move_to_end(tag)
+
+    body, compressed = entry
+    if use_gzip and compressed is not None:
+        headers['ETag'] = f'"{gzip_tag}"'
+        headers['Content-Encoding'] = 'gzip'
+        body = compressed
+    else:
+        headers['ETag'] = f'"{tag}"'
+    return web.Response(body=body, content_type='application/json', charset='utf-8', headers=headers)
+
+
+async def handle_projects(request):
+    projects = list_projects('qa')
+
+    def compute():
+        min_date, max_date = date_bounds('qa', projects)
+        return {'projects': projects, 'min_date': _day(min_date), 'max_date': _day(max_date)}
+
+    return await _respond(request, 'projects', ['qa'], projects, compute)
+
+
+async def handle_summary(request):
+    projects = _parse_projects(request)
+    date_range = _parse_date_range(request, projects)
+
+    def compute():
+        return {
+            'start': _day(date_range[0]) if date_range else None,
+            'end': _day(date_range[1]) if date_range else None,
+            'projects': project_summaries(projects, date_range),
+        }
+
+    return await _respond(request, 'summary', ['qa', 'preflight_wut'], projects, compute)
+
+
+async def handle_timeseries(request):
+    projects = _parse_projects(request)
+    date_range = _parse_date_range(request, projects)
+    resolution = _parse_resolution(request, date_range)
+    fields = _split(request.query.get('metrics', '')) or TIMESERIES_FIELDS
+    unknown = [field for field in fields if field not in TIMESERIES_FIELDS]
+    if unknown:
+        raise _error(web.HTTPBadRequest, f"不支援的指標: {', '.join(unknown)}")
+
+    def compute():
+        series = {project: [] for project in projects}
+        df = quality_timeseries(projects, date_range, resolution) if date_range else None
+        if df is not None:
+            df = df.rename(columns={'Date': 'date'})
+            for project, group in df.groupby('Project', observed=True):
+                series[str(project)] = frame_records(group[['date'] + fields])
+        return {
+            'resolution': resolution,
+            'start': _day(date_range[0]) if date_range else None,
+            'end': _day(date_range[1]) if date_range else None,
+            'series': series,
+        }
+
+    return await _respond(request, 'timeseries', ['qa'], projects, compute)
+
+
+async def handle_module_coverage(request):
+    project = request.query.get('project', '').strip()
+    if not project:
+        raise _error(web.HTTPBadRequest, "缺少 project 參數")
+    if project not in list_projects('module_coverage'):
+        raise _error(web.HTTPNotFound, f"找不到模組覆蓋率資料: {project}")
+    date_range = _parse_date_range(request, [project], kind='module_coverage')
+    resolution = _parse_resolution(request, date_range)
+
+    def compute():
+        module_df, totals = module_coverage_series(project, date_range, resolution)
+        modules = {}
+        if module_df is not None:
+            for module, group in module_df.groupby('module_name', observed=True):
+                modules[str(module)] = frame_records(
+                    group[['date', 'coverage_percentage', 'covered_line_number', 'total_line_number']]
+                )
+        return {
+            'project': project,
+            'resolution': resolution,
+            'start': _day(date_range[0]) if date_range else None,
+            'end': _day(date_range[1]) if date_range else None,
+            'modules': modules,
+            'total': frame_records(totals[['date', 'total_coverage']]) if totals is not None else [],
+        }
+
+    return await _respond(request, 'module_coverage', ['module_coverage'], [project], compute)
+
+
+async def handle_health(request):
+    return web.json_response({'status': 'ok', 'data_generation': request.app[WATCHER_KEY].version()})
+
+
+async def handle_metrics(request):
+    return web.Response(text=prometheus_text(), content_type='text/plain', charset='utf-8')
+
+
+async def _start_watcher(app):
+    # 第一次同步可能需要匯入所有CSV，在執行緒池中進行
+    watcher = await asyncio.get_running_loop().run_in_executor(None, DataWatcher)
+    watcher.start()
+    app[WATCHER_KEY] = watcher
+
+
+async def _stop_watcher(app):
+    app[WATCHER_KEY].stop()
+
+
+def create_app():
+    """建立aiohttp應用程式"""
+    app = web.Application()
+    app[CACHE_KEY] = OrderedDict()
+    app.on_startup.append(_start_watcher)
+    app.on_cleanup.append(_stop_watcher)
+    app.router.add_get('/api/projects', handle_projects)
+    app.router.add_get('/api/summary', handle_summary)
+    app.router.add_get('/api/timeseries', handle_timeseries)
+    app.router.add_get('/api/module_coverage', handle_module_coverage)
+    app.router.add_get('/healthz', handle_health)
+    app.router.add_get('/metrics', handle_metrics)
+    return app
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='軟體品質指標 HTTP/JSON API')
+    parser.add_argument('--host', default='0.0.0.0', help='監聽位址')
+    parser.add_argument('--port', type=int, default=8080, help='監聽埠號')
+    args = parser.parse_args(argv)
+
+    setup_logging()
+    logging.info("啟動API伺服器: %s:%s", args.host, args.port)
+    web.run_app(create_app(), host=args.host, port=args.port, print=None)
+
+
+if __name__ == '__main__':
+    main()
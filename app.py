@@ -7,47 +7,6 @@ st.set_page_config(
 )
 
 import logging
-import logging.handlers
-from datetime import datetime
-
-# 配置日志系统
-def setup_logging():
-    """配置应用程序日志系统
-    
-    设置:
-    - 日志级别: DEBUG
-    - 输出到文件: logs/app.log (每天轮换，保留7天)
-    - 输出到控制台
-    - 日志格式: 时间 - 级别 - 文件名:行号 - 消息
-    """
-    logger = logging.getLogger()
-    logger.setLevel(logging.DEBUG)
-    
-    # 创建logs目录
-    os.makedirs('logs', exist_ok=True)
-    
-    # 文件handler (每天轮换)
-    file_handler = logging.handlers.TimedRotatingFileHandler(
-        'logs/app.log', when='midnight', backupCount=7, encoding='utf-8'
-    )
-    file_handler.setLevel(logging.DEBUG)
-    
-    # 控制台handler
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(logging.INFO)
-    
-    # 日志格式
-    formatter = logging.Formatter(
-        '%(asctime)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    file_handler.setFormatter(formatter)
-    console_handler.setFormatter(formatter)
-    
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
-    
-    logging.info("日志系统初始化完成")
 
 # 
 # Software Quality Dashboard Application
@@ -80,45 +39,44 @@ def setup_logging():
 import streamlit as st
 import pandas as pd
 import os
-import glob
 import plotly.express as px
 from datetime import datetime
-from utils.quality_metrics import calculate_quality_score, get_style
-from utils.project_config import load_project_config
+from utils.logging_setup import setup_logging, new_rerun_id
+from utils.quality_metrics import calculate_quality_scores, get_style
+from utils.project_config import load_project_config, config_version
+from utils.data_store import KINDS, list_projects, ingest_failures, last_ingest_report, date_bounds, empty_frame, memory_footprint
+from utils.rollups import read_rollup, pick_resolution, RESOLUTIONS
+from utils.downsampling import downsample_frame
+from utils.data_watcher import DataWatcher
+from utils.exporter import EXPORT_DATASETS, EXPORT_FORMATS, export_bytes, export_filename
+from utils.table_view import PAGE_SIZES, sort_order, apply_filter, page_count, page_rows
+from utils.perf import cache_calls, cache_misses, timed, span, record_cache, record_payload, start_rerun, finish_rerun, prometheus_text
+from utils.preflight import aggregate_preflight, preflight_totals, format_combined, counts_by_period, PREFLIGHT_TYPES
+from utils.summaries import coverage_totals, portfolio_module_coverage, worst_modules
+from utils.indexes import project_date_index, read_indexed
+from utils.figure_cache import FigureCache, figure_key
 
-@st.cache_data  
-def load_preflight_wut_data(project_name):
-    """載入並返回指定項目的preflight_wut測試結果
-    
-    Args:
-        project_name (str): 項目名稱，對應data目錄下的子目錄
-        
-    Returns:
-        pandas.DataFrame or None: 包含preflight_wut測試結果的DataFrame
-            找不到文件時返回None
-    """
-    file_path = f'data/{project_name}/preflight_wut_result.csv'
-    if os.path.exists(file_path):
-        try:
-            df = pd.read_csv(file_path)
-            df['date'] = pd.to_datetime(df['date'])
-            return df
-        except Exception as e:
-            logging.error(f"載入preflight_wut數據失敗: {str(e)}", exc_info=True)
-            raise
-    
-    logging.warning(f"preflight_wut文件不存在: {file_path}")
-    return None
+# 載入的DataFrame以st.cache_resource在所有session間共用 (不複製)，
+# 呼叫端只能使用不修改原物件的操作 (篩選、assign、join等)。
+# pandas 3 (見requirements.txt) 預設使用copy-on-write，由共用資料衍生的DataFrame被修改時不會寫回共用資料。
+
+# 共用快取的最大項目數 (每組專案與日期範圍組合為一項)
+SHARED_CACHE_ENTRIES = 64
 
-@st.cache_data
-def load_module_coverage(project_name):
+@cache_calls('load_module_coverage')
+@st.cache_resource(max_entries=SHARED_CACHE_ENTRIES)
+@cache_misses
+def load_module_coverage(projects, date_range=None, columns=None, data_version=None):
     """載入並返回指定項目的模組覆蓋率數據
     
-    此函數會從data/{project_name}/module_coverage.csv讀取模組覆蓋率數據，
-    並將日期欄位轉換為datetime格式。
+    此函數會從Parquet儲存 (來源為data/{project}/module_coverage.csv)
+    讀取模組覆蓋率數據，日期欄位已在匯入時轉換為datetime格式。
     
     Args:
-        project_name (str): 項目名稱，對應data目錄下的子目錄
+        projects (str or list): 項目名稱或清單，對應data目錄下的子目錄
+        date_range (tuple, optional): (start_date, end_date)，只讀取範圍內的資料
+        columns (list, optional): 只讀取這些欄位，None表示全部
+        data_version (str, optional): 資料版本 (DataWatcher.version)，只作為快取鍵，資料變動時使快取失效
         
     Returns:
         pandas.DataFrame or None: 包含模組覆蓋率數據的DataFrame結構如下:
@@ -127,51 +85,257 @@ def load_module_coverage(project_name):
             - covered_line_number: 覆蓋行數
             - total_line_number: 總行數
             - coverage_percentage: 覆蓋率
+            - Project: 專案名稱
             找不到文件時返回None
             
     Example:
         >>> df = load_module_coverage("project1")
         >>> print(df.head())
     """
-    file_path = f'data/{project_name}/module_coverage.csv'
-    if os.path.exists(file_path):
-        try:
-            df = pd.read_csv(file_path)
-            df['date'] = pd.to_datetime(df['date'])
-            logging.info(f"成功載入module coverage數據，行數: {len(df)}")
-            return df
-        except Exception as e:
-            logging.error(f"載入module coverage數據失敗: {str(e)}", exc_info=True)
-            raise
+    try:
+        df = read_indexed('module_coverage', projects=projects, columns=columns, date_range=date_range)
+    except Exception as e:
+        logging.error(f"載入module coverage數據失敗: {str(e)}", exc_info=True)
+        raise
     
-    logging.warning(f"module coverage文件不存在: {file_path}")
-    return None
+    if df is None:
+        logging.warning(f"module coverage文件不存在: {projects}")
+        return None
+    logging.info(f"成功載入module coverage數據，行數: {len(df)}，記憶體: {memory_footprint(df) / 1024:.1f} KB")
+    return df
 
-# 載入所有專案資料
-@st.cache_data
-def load_all_projects():
-    project_files = glob.glob('data/project*/sample_qa_dashboard.csv')
-    all_data = []
+@cache_calls('load_catalog')
+@st.cache_resource(max_entries=SHARED_CACHE_ENTRIES)
+@cache_misses
+def load_catalog(data_version=None):
+    """返回專案清單與日期範圍，不需載入任何資料列
     
-    for file in project_files:
-        project_name = file.split('/')[1]  # 取得專案名稱
-        df = pd.read_csv(file)
-        df['Project'] = project_name
-        all_data.append(df)
+    Args:
+        data_version (str, optional): 資料版本 (DataWatcher.version)，只作為快取鍵，資料變動時使快取失效
+        
+    Returns:
+        tuple: (projects (tuple), min_date, max_date)
+    """
+    min_date, max_date = date_bounds('qa')
+    return tuple(list_projects('qa')), min_date, max_date
+
+# 載入專案資料 (由Parquet儲存讀取，只讀取指定專案與日期範圍)
+@cache_calls('load_all_projects')
+@st.cache_resource(max_entries=SHARED_CACHE_ENTRIES)
+@cache_misses
+def load_all_projects(projects=None, date_range=None, columns=None, data_version=None):
+    df = read_indexed('qa', projects=projects, columns=columns, date_range=date_range)
+    if df is None:
+        return empty_frame('qa', columns)
+    logging.info(f"成功載入專案數據，行數: {len(df)}，記憶體: {memory_footprint(df) / 1024:.1f} KB")
+    return df
+
+@cache_calls('load_rollup')
+@st.cache_resource(max_entries=SHARED_CACHE_ENTRIES)
+@cache_misses
+def load_rollup(kind, resolution, projects, date_range=None, data_version=None):
+    """載入預先彙總的趨勢資料 (日/週/月)
     
-    return pd.concat(all_data)
+    Args:
+        kind (str): 資料種類 ('qa' 或 'module_coverage')
+        resolution (str): 'daily', 'weekly' 或 'monthly'
+        projects (tuple): 專案清單
+        date_range (tuple, optional): (start_date, end_date)
+        data_version (str, optional): 資料版本 (DataWatcher.version)，只作為快取鍵，資料變動時使快取失效
+        
+    Returns:
+        pandas.DataFrame or None: 彙總資料，找不到時返回None
+    """
+    return read_rollup(kind, resolution, projects, date_range)
 
-# 主程式
-def main():
-    # 初始化logging系統
-    setup_logging()
+@cache_calls('load_module_portfolio')
+@st.cache_resource(max_entries=SHARED_CACHE_ENTRIES)
+@cache_misses
+def load_module_portfolio(projects, date_range=None, data_version=None):
+    """載入跨專案的模組覆蓋率 (由單一預先彙總表讀取，每個 (專案, 模組) 一列)
+    
+    Args:
+        projects (tuple): 專案清單
+        date_range (tuple, optional): (start_date, end_date)
+        data_version (str, optional): 資料版本 (DataWatcher.version)，只作為快取鍵，資料變動時使快取失效
+        
+    Returns:
+        pandas.DataFrame or None: portfolio_module_coverage的結果，找不到彙總表時返回None
+    """
+    return portfolio_module_coverage(projects, date_range)
+
+@cache_calls('load_preflight_counts')
+@st.cache_resource(max_entries=SHARED_CACHE_ENTRIES)
+@cache_misses
+def load_preflight_counts(projects, date_range=None, data_version=None):
+    """載入並彙總preflight_wut結果為每個專案每天各類型的筆數
+    
+    概覽卡片與Preflight WUT狀態圖共用此結果，原始資料只掃描一次。
+    
+    Args:
+        projects (tuple): 專案清單
+        date_range (tuple, optional): (start_date, end_date)
+        data_version (str, optional): 資料版本 (DataWatcher.version)，只作為快取鍵，資料變動時使快取失效
+        
+    Returns:
+        pandas.DataFrame or None: aggregate_preflight的結果，所有專案都沒有資料時返回None
+    """
+    df = read_indexed('preflight_wut', projects=projects, columns=['date', 'type'], date_range=date_range)
+    if df is None:
+        return None
+    return aggregate_preflight(df)
+
+@st.cache_resource
+def get_data_watcher():
+    """啟動 (每個行程一次) 並返回背景資料監看執行緒
+
+    儲存與rollup的同步只由監看執行緒進行 (建立時同步一次，之後定期輪詢)；
+    載入函數不再自行同步，資料變動經由data_version快取鍵反映。
+    """
+    watcher = DataWatcher()
+    watcher.start()
+    return watcher
+
+@st.cache_resource
+def get_figure_cache():
+    """返回行程內共用的圖表快取 (Figure物件，依序列化後的大小淘汰)"""
+    return FigureCache()
+
+def cached_figure(name, key_parts, build):
+    """從圖表快取取得圖表，不存在時呼叫build建立並存入
+    
+    Args:
+        name (str): 圖表名稱 (快取鍵的一部分，也用於效能統計)
+        key_parts (tuple): 決定圖表內容的篩選條件與資料版本
+        build (callable): 返回 (plotly Figure or None, 警告訊息 or None)
+        
+    Returns:
+        tuple: (plotly Figure or None, 序列化後的大小 (bytes), 警告訊息 or None)；
+            沒有圖表時不快取。返回的Figure由各session共用，不可修改。
+    """
+    cache = get_figure_cache()
+    key = figure_key(name, *key_parts)
+    entry = cache.get(key)
+    record_cache(f"figure:{name}", hit=entry is not None)
+    if entry is not None:
+        return entry + (None,)
+    with span(f"build_figure:{name}"):
+        fig, warning = build()
+        if fig is None:
+            return None, 0, warning
+        return cache.put(key, fig, len(fig.to_json())) + (warning,)
+
+def report_memory(frames):
+    """在側邊欄顯示本次使用的各DataFrame記憶體用量
     
-    # 載入資料
-    df = load_all_projects()
+    Args:
+        frames (dict): {顯示名稱: DataFrame or None}
+    """
+    with st.sidebar.expander('資料記憶體用量'):
+        for name, df in frames.items():
+            rows = 0 if df is None else len(df)
+            st.caption(f"{name}: {memory_footprint(df) / 1024:.1f} KB ({rows} 行)")
+
+def perf_enabled():
+    """是否顯示效能面板 (網址加上 ?perf=1，或設定環境變數 QA_DASHBOARD_PERF=1)"""
+    return st.query_params.get('perf') == '1' or os.environ.get('QA_DASHBOARD_PERF') == '1'
+
+def render_perf_panel(summary):
+    """在側邊欄顯示本次rerun的效能量測結果 (隱藏面板)
     
-    # 轉換日期格式
-    df['Date'] = pd.to_datetime(df['Date'])
+    Args:
+        summary (dict): finish_rerun() 的返回值
+    """
+    with st.sidebar.expander('效能監測', expanded=True):
+        st.caption(f"本次rerun總耗時: {summary['total_ms']:.1f} ms")
+        st.dataframe(
+            pd.DataFrame(list(summary['spans'].items()), columns=['階段', '耗時(ms)'])
+            .sort_values('耗時(ms)', ascending=False),
+            hide_index=True
+        )
+        if summary['cache']:
+            st.dataframe(
+                pd.DataFrame(
+                    [(name, hits, misses) for name, (hits, misses) in summary['cache'].items()],
+                    columns=['快取', '命中', '未命中']
+                ),
+                hide_index=True
+            )
+        if summary['payloads']:
+            st.dataframe(
+                pd.DataFrame(
+                    [(name, size / 1024) for name, size in summary['payloads'].items()],
+                    columns=['項目', '大小(KB)']
+                ),
+                hide_index=True
+            )
+        failures = ingest_failures()
+        if failures:
+            st.warning(f"{len(failures)} 個來源檔匯入失敗，檔案變動後才會重試")
+            st.dataframe(
+                pd.DataFrame(failures)[['source', 'error']].rename(columns={'source': '來源檔', 'error': '錯誤'}),
+                hide_index=True
+            )
+        ingest_report = last_ingest_report()
+        if ingest_report:
+            st.caption('最近一次匯入')
+            st.dataframe(
+                pd.DataFrame(ingest_report)[['source', 'ingested', 'rows', 'seconds']]
+                .rename(columns={'source': '來源檔', 'ingested': '已匯入', 'rows': '行數', 'seconds': '耗時(s)'}),
+                hide_index=True
+            )
+        figure_stats = get_figure_cache().stats()
+        st.caption(
+            f"圖表快取: {figure_stats['entries']} 項，{figure_stats['bytes'] / 1024 / 1024:.1f} / "
+            f"{figure_stats['max_bytes'] / 1024 / 1024:.0f} MB，已淘汰 {figure_stats['evictions']} 項"
+        )
+        metrics = prometheus_text()
+        st.download_button('下載Prometheus指標', metrics, file_name='metrics.prom', mime='text/plain')
+        st.code(metrics, language='text')
+
+# 指標表格 (column_name, display_name, format_string, tooltip_text)
+METRICS = [
+    ('Test_Executed', '測試執行數', '{:.0f}', '已執行的測試案例總數'),
+    ('Test_Passed', '測試通過數', '{:.0f}', '成功通過的測試案例數'),
+    ('Pass_Rate(%)', '通過率', '{:.1f}%', '測試通過百分比'),
+    ('Open_Bugs', '開放缺陷數', '{:.0f}', '目前未解決的缺陷數量'),
+    ('Critical_Bugs', '嚴重缺陷', '{:.0f}', '嚴重等級的缺陷數量'),
+    ('Code_Coverage', '代碼覆蓋率', '{:.1f}%', '測試覆蓋的代碼百分比')
+]
+PREFLIGHT_METRIC = ('preflight_wut_combined', 'Preflight WUT', '{}', 'Build Fail / WUT Fail / Pass / Total')
+
+def _clamp_url_date_range(values, min_date, max_date):
+    """將URL的 (開始, 結束) 日期限制在資料範圍內
+
+    開始晚於結束時互換；整個範圍都在資料範圍外時返回None (改用預設範圍)。
+
+    Args:
+        values (list): URL中的兩個日期字串
+        min_date, max_date (datetime): 資料最早/最晚日期
+
+    Returns:
+        tuple or None: (start_date, end_date) 的pandas.Timestamp
+    """
+    dates = [pd.to_datetime(value) for value in values]
+    if any(pd.isna(date) for date in dates):
+        return None
+    start_date, end_date = sorted(dates)
+    min_date, max_date = pd.Timestamp(min_date), pd.Timestamp(max_date)
+    if end_date < min_date or start_date > max_date:
+        return None
+    return max(start_date, min_date), min(end_date, max_date)
+
+def sidebar_filters(projects, min_date, max_date):
+    """繪製側邊欄篩選控制並返回篩選條件
     
+    Args:
+        projects (tuple): 可選擇的專案
+        min_date (pandas.Timestamp): 資料最早日期
+        max_date (pandas.Timestamp): 資料最晚日期
+        
+    Returns:
+        tuple: (selected_projects, date_range, start_date, end_date)
+    """
     # 解析URL參數 - 處理多個project
     url_project = st.query_params.get("project", [])
     if isinstance(url_project, str):
@@ -179,14 +343,12 @@ def main():
         url_project = [p.strip() for p in url_project.split(",") if p.strip()]
     url_date_range = st.query_params.get("date_range", [])
     if isinstance(url_date_range, str):
-        url_date_range = [url_date_range]
+        # 將逗號分隔的開始/結束日期轉換為list
+        url_date_range = [d.strip() for d in url_date_range.split(",") if d.strip()]
     
     # 側邊欄設定
     st.sidebar.title('篩選控制')
     
-    # 專案選擇
-    projects = df['Project'].unique()
-    
     # 設置默認選中的專案 (優先使用URL參數)
     default_projects = []
     if url_project:
@@ -206,22 +368,22 @@ def main():
     )
     
     # 日期範圍選擇
-    min_date = df['Date'].min().to_pydatetime()
-    max_date = df['Date'].max().to_pydatetime()
+    min_date = min_date.to_pydatetime()
+    max_date = max_date.to_pydatetime()
     
     # 設置默認日期範圍 (優先使用URL參數)
+    date_range = None
     if url_date_range and len(url_date_range) == 2:
         try:
-            start_date = pd.to_datetime(url_date_range[0])
-            end_date = pd.to_datetime(url_date_range[1])
-            date_range = (start_date, end_date)
-            time_period = '自訂'
-        except:
-            time_period = st.sidebar.selectbox(
-                '快速選擇時間範圍',
-                ['自訂', '過去1個月', '過去2個月', '過去3個月', '過去6個月', '過去12個月'],
-                index=0
+            date_range = _clamp_url_date_range(url_date_range, min_date, max_date)
+        except (ValueError, TypeError):
+            date_range = None
+        if date_range is None:
+            st.sidebar.warning(
+                f"URL日期範圍無效或不在資料範圍 ({min_date:%Y-%m-%d} ~ {max_date:%Y-%m-%d}) 內，已改用預設範圍"
             )
+    if date_range is not None:
+        time_period = '自訂'
     else:
         time_period = st.sidebar.selectbox(
             '快速選擇時間範圍',
@@ -237,410 +399,732 @@ def main():
     else:
         date_range = st.sidebar.date_input(
             '自訂日期範圍',
-            value=date_range if 'date_range' in locals() else (min_date, max_date),
+            value=date_range if date_range is not None else (min_date, max_date),
             min_value=min_date,
             max_value=max_date
         )
     
-    # 強制使用亮色主題
-    theme = '亮色'
-    
-    # 過濾資料 - 處理日期範圍選擇不完整的情況
+    # 處理日期範圍選擇不完整的情況
     if len(date_range) == 2:
         start_date, end_date = pd.to_datetime(date_range[0]), pd.to_datetime(date_range[1])
     else:
-        start_date, end_date = min_date, max_date
-        
-    filtered_df = df[
-        (df['Project'].isin(selected_projects)) &
-        (df['Date'] >= start_date) &
-        (df['Date'] <= end_date)
-    ]
-    
-    # 載入preflight_wut數據
-    all_preflight_wut = None
-    if len(selected_projects) > 0:
-        preflight_wut_data = []
-        for project in selected_projects:
-            pf_df = load_preflight_wut_data(project)
-            if pf_df is not None:
-                pf_df['Project'] = project
-                preflight_wut_data.append(pf_df)
-        
-        if len(preflight_wut_data) > 0:
-            all_preflight_wut = pd.concat(preflight_wut_data)
-            # 過濾preflight_wut數據
-            if len(date_range) == 2:
-                all_preflight_wut = all_preflight_wut[
-                    (all_preflight_wut['date'] >= start_date) & 
-                    (all_preflight_wut['date'] <= end_date)
-                ]
+        start_date, end_date = pd.Timestamp(min_date), pd.Timestamp(max_date)
     
-    # 主頁面標題
-    st.title('軟體品質儀表板')
-    st.markdown("---")
+    return selected_projects, date_range, start_date, end_date
 
-    # 專案品質概覽區
-    st.subheader('專案品質概覽')
-    if len(selected_projects) > 0:
-        latest_data = filtered_df.sort_values('Date').groupby('Project').last().reset_index()
-        
-        # 顯示所選專案清單
-        st.markdown(f"**已選擇專案:** {', '.join(selected_projects)}")
+@cache_calls('compute_overview')
+@st.cache_data(max_entries=SHARED_CACHE_ENTRIES)
+@cache_misses
+def compute_overview(projects, start_date, end_date, qa_version, preflight_version, config_versions):
+    """計算專案品質概覽卡片的內容
+    
+    只依賴參數列出的輸入；篩選條件、資料版本或配置都沒變時直接使用快取結果。
+    
+    Args:
+        projects (tuple): 選擇的專案
+        start_date, end_date (pandas.Timestamp): 日期範圍
+        qa_version, preflight_version (str): 資料版本
+        config_versions (tuple): 專案配置版本
         
-        # 指標表格 (column_name, display_name, format_string, tooltip_text)
-        metrics = [
-            ('Test_Executed', '測試執行數', '{:.0f}', '已執行的測試案例總數'),
-            ('Test_Passed', '測試通過數', '{:.0f}', '成功通過的測試案例數'),
-            ('Pass_Rate(%)', '通過率', '{:.1f}%', '測試通過百分比'),
-            ('Open_Bugs', '開放缺陷數', '{:.0f}', '目前未解決的缺陷數量'),
-            ('Critical_Bugs', '嚴重缺陷', '{:.0f}', '嚴重等級的缺陷數量'),
-            ('Code_Coverage', '代碼覆蓋率', '{:.1f}%', '測試覆蓋的代碼百分比')
-        ]
+    Returns:
+        tuple: (metrics, 每個專案的卡片資料清單)
+    """
+    preflight_counts = load_preflight_counts(projects, (start_date, end_date), data_version=preflight_version)
+    with span('load_project_config'):
+        configs = {project: load_project_config(project) for project in projects}
+    
+    # 每個專案在結束日期當時的最新資料 (索引只載入所選且尚未載入或已變動的專案)
+    with span('project_date_index'):
+        latest_data = project_date_index('qa').latest(projects, start_date, end_date)
+    
+    # 一次計算所有專案最新資料的品質評分
+    with span('calculate_quality_scores'):
+        latest_scores = calculate_quality_scores(latest_data, configs)
+    latest_scores.index = latest_data['Project']
+    latest_rows = dict(zip(latest_data['Project'], latest_data.to_dict('records')))
+    
+    metrics = list(METRICS)
+    
+    # 添加preflight_wut組合指標
+    if preflight_counts is not None:
+        pf_totals = preflight_totals(preflight_counts)
+        metrics.append(PREFLIGHT_METRIC)
+    
+    # 收集所有專案數據
+    all_projects_data = []
+    for project in projects:
+        # 如果沒有數據，使用空值
+        project_data = latest_rows.get(project, {})
+        # 品質評分 (沒有數據時為0分)
+        if project in latest_scores.index:
+            quality = latest_scores.loc[project]
+        else:
+            quality = {'score': 0, 'grade': 'N/A'}
         
-        # 添加preflight_wut組合指標
-        if all_preflight_wut is not None:
-            metrics.extend([
-                ('preflight_wut_combined', 'Preflight WUT', '{}', 'Build Fail / WUT Fail / Pass / Total')
-            ])
+        # 獲取專案配置
+        config = configs[project]
         
-        # 顯示所有專案數據
-        all_projects_data = []
-        for project in selected_projects:
-            project_df = latest_data[latest_data['Project'] == project]
-            if len(project_df) == 0:
-                # 如果沒有數據，使用空值
-                project_data = {col: None for col in df.columns}
-            else:
-                project_data = project_df.iloc[0]
-            # 計算品質評分
-            metrics_dict = {col: project_data[col] for col, _, _, _ in metrics if col in project_data}
-
-            quality = calculate_quality_score(project, metrics_dict)
-            
-            # 獲取專案配置
-            #print(f"專案名稱: {project}")
-            #print(f"{project['專案名稱']}")
-            config = load_project_config(project)
-            #print(f"{config['description']}")
+        row_data = {'專案名稱': project}
+        for col, title, fmt, _ in metrics:
+            value = project_data.get(col)
+            props = config['metrics'].get(col, {})
             
+            # 處理preflight_wut組合數據
+            if col == 'preflight_wut_combined' and preflight_counts is not None:
+                value = format_combined(pf_totals, project)
+                style = "color: black"
+            else:
+                style = get_style(value or 0, props.get('threshold',0), props.get('higher_better',True))
             
-            # 收集專案數據
-            row_data = {'專案名稱': project}
-            for col, title, fmt, _ in metrics:
-                value = project_data.get(col)
-                props = config['metrics'].get(col, {})
+            formatted_value = "N/A" if value is None else fmt.format(value)
+            row_data[title] = {
+                'value': formatted_value,
+                'style': style
+            }
+        row_data['品質評分'] = f"{quality['score']} ({quality['grade']})"
+        if 'description' in config and config['description']:
+            row_data['description'] = config['description']
+        all_projects_data.append(row_data)
+    
+    return metrics, all_projects_data
+
+# 儀表板各區塊以st.fragment包裝，區塊內的互動只重新執行該區塊
+@st.fragment
+@timed('section:overview')
+def render_overview(selected_projects, date_range, start_date, end_date, versions):
+    """專案品質概覽區"""
+    st.subheader('專案品質概覽')
+    if len(selected_projects) == 0:
+        return
+    
+    metrics, all_projects_data = compute_overview(
+        tuple(selected_projects), start_date, end_date,
+        versions['qa'], versions['preflight_wut'], config_version(selected_projects)
+    )
+    
+    # 顯示所選專案清單
+    st.markdown(f"**已選擇專案:** {', '.join(selected_projects)}")
+    
+    # 為每個專案顯示指標卡片
+    for project in all_projects_data:
+        with st.expander(f"{project['專案名稱']} - 品質評分: {project['品質評分']}", expanded=True):
+            # 根據metrics數量動態調整列數 (每行最多4列)
+            num_cols = min(len(metrics), 4)
+            cols = st.columns(num_cols)
+            for i, (_, title, _, tooltip) in enumerate(metrics):
+                # 計算當前應顯示的列索引
+                col_idx = i % num_cols
+                # 當列索引歸零時創建新行
+                if col_idx == 0 and i > 0:
+                    cols = st.columns(num_cols)
+                with cols[col_idx]:
+                    with st.container():
+                        st.markdown(
+                            f"""
+                            <div style="
+                                border: 1px solid #ddd;
+                                border-radius: 8px;
+                                padding: 10px;
+                                margin: 5px;
+                                box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+                                background-color: #f9f9f9;
+                            ">
+                                <div style="font-weight: bold; margin-bottom: 5px; color: black;">
+                                    {title}
+                                </div>
+                                <div style='{project[title]["style"]}; font-size: 20px;'>
+                                    {project[title]["value"]}
+                                </div>
+                            </div>
+                            """,
+                            #help=title_dict.get(title, ''),
+                            unsafe_allow_html=True
+                        )
+                        st.markdown(f"(?)", help=tooltip)
+    
+        # 顯示專案說明和詳情連結
+        if 'description' in project and project['description']:
+            with st.expander(f"{project['專案名稱']}詳情"):
+                st.write(f"{project['專案名稱']}詳情")
+                st.write(project['description'])
+
+                # 生成包含當前篩選條件的URL
+                url = f"/app.py?project={selected_projects[0]}&date_range={date_range[0].strftime('%Y-%m-%d')},{date_range[1].strftime('%Y-%m-%d')}"
+                st.markdown(f"[查看完整專案詳情]({url})", unsafe_allow_html=True)
                 
-                # 處理preflight_wut組合數據
-                if col == 'preflight_wut_combined' and all_preflight_wut is not None:
-                    pf_project = all_preflight_wut[all_preflight_wut['Project'] == project]
-                    build_fail = len(pf_project[pf_project['type'] == 'build fail'])
-                    wut_fail = len(pf_project[pf_project['type'] == 'wut fail'])
-                    passed = len(pf_project[pf_project['type'] == 'pass'])
-                    total = len(pf_project)
-                    value = f"{build_fail}/{wut_fail}/{passed}/{total}"
-                    style = "color: black"
-                else:
-                    style = get_style(value or 0, props.get('threshold',0), props.get('higher_better',True))
+                # 顯示URL使用說明
                 
-                formatted_value = "N/A" if value is None else fmt.format(value)
-                row_data[title] = {
-                    'value': formatted_value,
-                    'style': style
-                }
-            row_data['品質評分'] = f"{quality['score']} ({quality['grade']})"
-            if 'description' in config and config['description']:
-                row_data['description'] = config['description']
-            all_projects_data.append(row_data)
+                #    st.write("""
+                #    **分享當前篩選結果：**
+                #    
+                #    1. **多專案選擇** (用逗號分隔):
+                #    ```
+                #    /app.py?project=project1,project2,project3
+                #    ```
+                #    
+                #    2. **日期範圍** (開始日期,結束日期):
+                #    ```
+                #    &date_range=2025-01-01,2025-04-01
+                #    ```
+                #    
+                #    3. **完整範例**:
+                #    ```
+                #    /app.py?project=project1,project2&date_range=2025-01-01,2025-04-01
+                #    ```
+                #    
+                #    注意：日期格式為YYYY-MM-DD
+                #    """)
+
+# 趨勢分析分頁 (依顯示順序)；Preflight分頁僅在單一專案且有資料時出現
+TREND_TABS = ["測試通過率", "缺陷趨勢", "代碼覆蓋率", "品質評分趨勢"]
+PREFLIGHT_TAB = "Preflight WUT 狀態"
+
+def compute_trend_figure(tab, projects, start_date, end_date, data_version, config_versions=None):
+    """建立單一趨勢分頁的圖表
+    
+    只在該分頁被開啟且圖表快取中沒有時呼叫 (見cached_figure)，圖表依
+    (分頁, 篩選條件, 資料版本) 快取，切換回已看過的分頁時不需重新建立。
+    
+    Args:
+        tab (str): 分頁名稱 (TREND_TABS 或 PREFLIGHT_TAB)
+        projects (tuple): 選擇的專案
+        start_date, end_date (pandas.Timestamp): 日期範圍
+        data_version (str): 該分頁所用資料的版本 (Preflight分頁為preflight_wut，其餘為qa)
+        config_versions (tuple, optional): 專案配置版本 (僅品質評分分頁使用)
         
-        # 為每個專案顯示指標卡片
-        for project in all_projects_data:
-            with st.expander(f"{project['專案名稱']} - 品質評分: {project['品質評分']}", expanded=True):
-                # 根據metrics數量動態調整列數 (每行最多4列)
-                num_cols = min(len(metrics), 4)
-                cols = st.columns(num_cols)
-                for i, (_, title, _, tooltip) in enumerate(metrics):
-                    # 計算當前應顯示的列索引
-                    col_idx = i % num_cols
-                    # 當列索引歸零時創建新行
-                    if col_idx == 0 and i > 0:
-                        cols = st.columns(num_cols)
-                    with cols[col_idx]:
-                        with st.container():
-                            st.markdown(
-                                f"""
-                                <div style="
-                                    border: 1px solid #ddd;
-                                    border-radius: 8px;
-                                    padding: 10px;
-                                    margin: 5px;
-                                    box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-                                    background-color: #f9f9f9;
-                                ">
-                                    <div style="font-weight: bold; margin-bottom: 5px; color: black;">
-                                        {title}
-                                    </div>
-                                    <div style='{project[title]["style"]}; font-size: 20px;'>
-                                        {project[title]["value"]}
-                                    </div>
-                                </div>
-                                """,
-                                #help=title_dict.get(title, ''),
-                                unsafe_allow_html=True
-                            )
-                            st.markdown(f"(?)", help=tooltip)
+    Returns:
+        plotly Figure
+    """
+    # 依時間跨度自動選擇趨勢圖解析度 (日/週/月)，限制每條曲線的點數
+    resolution = pick_resolution(start_date, end_date)
+    resolution_label = '' if resolution == 'daily' else f" ({RESOLUTIONS[resolution][1]}彙總)"
+    
+    # Preflight WUT狀態圖 (僅顯示單一專案時)
+    if tab == PREFLIGHT_TAB:
+        logging.info(f"開始生成Preflight WUT狀態圖表 - 專案: {projects[0]}")
+        preflight_counts = load_preflight_counts(projects, (start_date, end_date), data_version=data_version)
         
-            # 顯示專案說明和詳情連結
-            if 'description' in project and project['description']:
-                with st.expander(f"{project['專案名稱']}詳情"):
-                    st.write(f"{project['專案名稱']}詳情")
-                    st.write(project['description'])
-
-                    if len(selected_projects) > 0:
-                        # 生成包含當前篩選條件的URL
-                        url = f"/app.py?project={selected_projects[0]}&date_range={date_range[0].strftime('%Y-%m-%d')},{date_range[1].strftime('%Y-%m-%d')}"
-                        st.markdown(f"[查看完整專案詳情]({url})", unsafe_allow_html=True)
-                    
-                        # 顯示URL使用說明
-                        
-                        #    st.write("""
-                        #    **分享當前篩選結果：**
-                        #    
-                        #    1. **多專案選擇** (用逗號分隔):
-                        #    ```
-                        #    /app.py?project=project1,project2,project3
-                        #    ```
-                        #    
-                        #    2. **日期範圍** (開始日期,結束日期):
-                        #    ```
-                        #    &date_range=2025-01-01,2025-04-01
-                        #    ```
-                        #    
-                        #    3. **完整範例**:
-                        #    ```
-                        #    /app.py?project=project1,project2&date_range=2025-01-01,2025-04-01
-                        #    ```
-                        #    
-                        #    注意：日期格式為YYYY-MM-DD
-                        #    """)
+        # 準備數據 (與概覽卡片共用每日筆數，依趨勢圖解析度彙總)
+        pf_counts = counts_by_period(preflight_counts, resolution)
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            logging.debug(f"最終圖表數據: {pf_counts.shape}")
         
+        # 繪製堆疊長條圖
+        fig = px.bar(
+            pf_counts,
+            x='date',
+            y=list(PREFLIGHT_TYPES),
+            title=f"{projects[0]} Preflight WUT 狀態趨勢{resolution_label}",
+            labels={'value': '數量', 'date': '日期'},
+            color_discrete_map={
+                'build fail': '#FF5252',
+                'wut fail': '#FFD740', 
+                'pass': '#4CAF50'
+            },
+            barmode='stack'
+        )
+        logging.info("Preflight WUT狀態圖表生成成功")
+        return fig
+    
+    filtered_df = load_all_projects(projects, (start_date, end_date), data_version=data_version)
     
-    # 趨勢圖表區
+    # 判斷是否為同一天
+    is_single_day = len(filtered_df['Date'].unique()) == 1
+    if is_single_day:
+        day_label = filtered_df['Date'].iloc[0].strftime('%Y/%m/%d')
+    else:
+        trend_df = load_rollup('qa', resolution, projects, (start_date, end_date), data_version=data_version)
+        if trend_df is None:
+            trend_df = filtered_df
+    
+    if tab == "測試通過率":
+        if is_single_day:
+            fig = px.bar(
+                filtered_df,
+                x='Project',
+                y='Pass_Rate(%)',
+                color='Project',
+                title=f"{day_label} 測試通過率",
+                text='Pass_Rate(%)'
+            )
+            fig.update_traces(texttemplate='%{text:.1f}%', textposition='outside')
+        else:
+            fig = px.line(
+                downsample_frame(trend_df, 'Date', 'Pass_Rate(%)', group='Project'),
+                x='Date',
+                y='Pass_Rate(%)',
+                color='Project',
+                title=f'測試通過率趨勢{resolution_label}'
+            )
+    elif tab == "缺陷趨勢":
+        if is_single_day:
+            fig = px.bar(
+                filtered_df,
+                x='Project',
+                y=['Open_Bugs', 'Critical_Bugs'],
+                color='Project',
+                title=f"{day_label} 缺陷數量",
+                barmode='group'
+            )
+        else:
+            fig = px.line(
+                downsample_frame(trend_df, 'Date', ['Open_Bugs', 'Critical_Bugs'], group='Project'),
+                x='Date',
+                y=['Open_Bugs', 'Critical_Bugs'],
+                color='Project',
+                title=f'缺陷趨勢{resolution_label}'
+            )
+    elif tab == "代碼覆蓋率":
+        if is_single_day:
+            fig = px.bar(
+                filtered_df,
+                x='Project',
+                y='Code_Coverage',
+                color='Project',
+                title=f"{day_label} 代碼覆蓋率",
+                text='Code_Coverage'
+            )
+            fig.update_traces(texttemplate='%{text:.1f}%', textposition='outside')
+        else:
+            fig = px.line(
+                downsample_frame(trend_df, 'Date', 'Code_Coverage', group='Project'),
+                x='Date',
+                y='Code_Coverage',
+                color='Project',
+                title=f'代碼覆蓋率趨勢{resolution_label}'
+            )
+    elif tab == "品質評分趨勢":
+        # 以批次評分計算每個日期的品質評分
+        with span('load_project_config'):
+            configs = {project: load_project_config(project) for project in projects}
+        if is_single_day:
+            with span('calculate_quality_scores'):
+                scored_df = filtered_df.join(calculate_quality_scores(filtered_df, configs))
+            fig = px.bar(
+                scored_df,
+                x='Project',
+                y='score',
+                color='Project',
+                title=f"{day_label} 品質評分",
+                labels={'score': '品質評分'},
+                text='grade'
+            )
+        else:
+            with span('calculate_quality_scores'):
+                scored_df = trend_df.join(calculate_quality_scores(trend_df, configs))
+            fig = px.line(
+                downsample_frame(scored_df, 'Date', 'score', group='Project'),
+                x='Date',
+                y='score',
+                color='Project',
+                title=f'品質評分趨勢{resolution_label}',
+                labels={'score': '品質評分'},
+                hover_data=['grade']
+            )
+    else:
+        raise ValueError(f"未知的趨勢分頁: {tab}")
+    return fig
+
+@st.fragment
+@timed('section:trends')
+def render_trends(selected_projects, start_date, end_date, versions):
+    """趨勢圖表區
+    
+    分頁以水平radio呈現，只有目前選取的分頁會建立圖表並傳送到瀏覽器
+    (st.tabs會一次建立所有分頁的內容)。
+    """
     st.markdown("---")
     st.subheader('趨勢分析')
+    if len(selected_projects) == 0:
+        return
     
-    if len(selected_projects) > 0:
-        # 判斷是否為同一天
-        is_single_day = len(filtered_df['Date'].unique()) == 1
+    projects = tuple(selected_projects)
+    tabs = list(TREND_TABS)
+    if len(projects) == 1 and load_preflight_counts(
+        projects, (start_date, end_date), data_version=versions['preflight_wut']
+    ) is not None:
+        tabs.append(PREFLIGHT_TAB)
+    
+    tab = st.radio('趨勢分頁', tabs, horizontal=True, key='trend_tab', label_visibility='collapsed')
+    
+    data_version = versions['preflight_wut'] if tab == PREFLIGHT_TAB else versions['qa']
+    config_versions = config_version(projects) if tab == "品質評分趨勢" else None
+    try:
+        fig, size, _ = cached_figure(
+            'trend', (tab, projects, start_date, end_date, data_version, config_versions),
+            lambda: (compute_trend_figure(tab, projects, start_date, end_date, data_version, config_versions), None)
+        )
+    except Exception as e:
+        error_msg = f"繪製趨勢圖時發生錯誤: {str(e)}"
+        logging.error(error_msg, exc_info=True)
+        st.error(error_msg)
+        return
+    
+    record_payload(f"trend:{tab}", size)
+    st.plotly_chart(fig, use_container_width=True)
+
+@cache_calls('load_detail_order')
+@st.cache_resource(max_entries=SHARED_CACHE_ENTRIES)
+@cache_misses
+def load_detail_order(projects, start_date, end_date, qa_version, sort_column, ascending):
+    """返回詳細資料排序後的位置索引 (各session共用)
+    
+    以專案、日期為次要排序鍵，只有排序條件或資料改變時才重新排序。
+    """
+    filtered_df = load_all_projects(projects, (start_date, end_date), data_version=qa_version)
+    columns = [sort_column] + [c for c in ('Project', 'Date') if c != sort_column]
+    return sort_order(filtered_df, columns, ascending)
+
+@cache_calls('load_filtered_order')
+@st.cache_resource(max_entries=SHARED_CACHE_ENTRIES)
+@cache_misses
+def load_filtered_order(projects, start_date, end_date, qa_version, sort_column, ascending, filter_column, filter_query):
+    """返回套用欄位篩選後、仍保持排序的位置索引"""
+    filtered_df = load_all_projects(projects, (start_date, end_date), data_version=qa_version)
+    order = load_detail_order(projects, start_date, end_date, qa_version, sort_column, ascending)
+    return apply_filter(filtered_df, order, filter_column, filter_query)
+
+@st.fragment
+@timed('section:detail_table')
+def render_detail_table(selected_projects, start_date, end_date, versions):
+    """資料表格區 (伺服器端排序、篩選與分頁，只傳送目前頁面)"""
+    st.markdown("---")
+    st.subheader('詳細資料')
+    projects = tuple(selected_projects)
+    filtered_df = load_all_projects(projects, (start_date, end_date), data_version=versions['qa'])
+    columns = list(filtered_df.columns)
+    
+    col1, col2, col3, col4 = st.columns([2, 1, 2, 2])
+    with col1:
+        sort_column = st.selectbox(
+            '排序欄位', columns,
+            index=columns.index('Project') if 'Project' in columns else 0, key='detail_sort'
+        )
+    with col2:
+        ascending = st.radio('順序', ['遞增', '遞減'], key='detail_order') == '遞增'
+    with col3:
+        filter_column = st.selectbox('篩選欄位', columns, key='detail_filter_column')
+    with col4:
+        filter_query = st.text_input(
+            '篩選條件', key='detail_filter_query',
+            help='數值: >=90、<5、!=0、80..95；日期: 2024-03；文字: 部分比對'
+        ).strip()
+    
+    try:
+        order = load_filtered_order(
+            projects, start_date, end_date, versions['qa'],
+            sort_column, ascending, filter_column, filter_query
+        )
+    except ValueError as e:
+        st.warning(str(e))
+        order = load_detail_order(projects, start_date, end_date, versions['qa'], sort_column, ascending)
+    
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        page_size = st.selectbox('每頁列數', PAGE_SIZES, index=1, key='detail_page_size')
+    pages = page_count(len(order), page_size)
+    with col2:
+        page = st.number_input('頁碼', min_value=1, max_value=pages, value=1, step=1, key='detail_page')
+    page = min(page, pages)
+    
+    page_df = page_rows(filtered_df, order, page, page_size)
+    record_payload('detail_table', memory_footprint(page_df))
+    st.dataframe(page_df, use_container_width=True, hide_index=True)
+    st.caption(f"第 {page} / {pages} 頁，共 {len(order)} 行")
+
+def compute_module_coverage_figure(project, start_date, end_date, module_version):
+    """建立單一專案的模組覆蓋率圖表 (圖表快取中沒有時才呼叫，見cached_figure)
+    
+    Returns:
+        tuple: (plotly Figure or None, 警告訊息 or None)
+    """
+    filtered_module_df = load_module_coverage(
+        project, (start_date, end_date), data_version=module_version
+    )
+    if filtered_module_df is None:
+        return None, "找不到模組覆蓋率資料"
+    if len(filtered_module_df) == 0:
+        return None, "選定日期範圍內無模組覆蓋率數據"
+    
+    # 判斷是否為同一天
+    is_single_day = len(filtered_module_df['date'].unique()) == 1
+    
+    if is_single_day:
+        # 計算總覆蓋率
+        daily_totals = coverage_totals(filtered_module_df)
         
-        if len(selected_projects) == 1 and all_preflight_wut is not None:
-            tabs = ["測試通過率", "缺陷趨勢", "代碼覆蓋率", "Preflight WUT 狀態"]
-            tab1, tab2, tab3, tab4 = st.tabs(tabs)
-        else:
-            tabs = ["測試通過率", "缺陷趨勢", "代碼覆蓋率"] 
-            tab1, tab2, tab3 = st.tabs(tabs)
+        # 確保有數據
+        if len(daily_totals) == 0:
+            return None, "無法計算總覆蓋率"
+            
+        # 單日數據 - 使用長條圖
+        fig = px.bar(
+            filtered_module_df,
+            x='module_name',
+            y='coverage_percentage',
+            color='module_name',
+            title=f"{filtered_module_df['date'].iloc[0].strftime('%Y/%m/%d')} 模組覆蓋率",
+            labels={'coverage_percentage': '覆蓋率(%)'},
+            text='coverage_percentage'
+        )
+        fig.update_traces(texttemplate='%{text:.2f}%', textposition='outside')
         
-        with tab1:
-            if is_single_day:
-                fig = px.bar(
-                    filtered_df,
-                    x='Project',
-                    y='Pass_Rate(%)',
-                    color='Project',
-                    title=f"{filtered_df['Date'].iloc[0].strftime('%Y/%m/%d')} 測試通過率",
-                    text='Pass_Rate(%)'
-                )
-                fig.update_traces(texttemplate='%{text:.1f}%', textposition='outside')
-            else:
-                fig = px.line(
-                    filtered_df,
-                    x='Date',
-                    y='Pass_Rate(%)',
-                    color='Project',
-                    title='測試通過率趨勢'
-                )
-            st.plotly_chart(fig, use_container_width=True)
+        # 添加總覆蓋率橫線
+        fig.add_hline(
+            y=daily_totals['total_coverage'].iloc[0],
+            line_dash="dot",
+            line_color="black",
+            annotation_text=f"總覆蓋率: {daily_totals['total_coverage'].iloc[0]:.2f}%",
+            annotation_position="top right"
+        )
+    else:
+        # 多日數據 - 使用折線圖 (依時間跨度使用日/週/月彙總)
+        resolution = pick_resolution(start_date, end_date)
+        resolution_label = '' if resolution == 'daily' else f" ({RESOLUTIONS[resolution][1]}彙總)"
+        module_trend_df = load_rollup(
+            'module_coverage', resolution, (project,), (start_date, end_date),
+            data_version=module_version
+        )
+        if module_trend_df is None:
+            # 彙總表尚未建立時使用每日原始資料 (由downsample_frame限制點數)
+            module_trend_df = filtered_module_df
+        trend_totals = coverage_totals(module_trend_df)
         
-        with tab2:
-            if is_single_day:
-                fig = px.bar(
-                    filtered_df,
-                    x='Project',
-                    y=['Open_Bugs', 'Critical_Bugs'],
-                    color='Project',
-                    title=f"{filtered_df['Date'].iloc[0].strftime('%Y/%m/%d')} 缺陷數量",
-                    barmode='group'
-                )
-            else:
-                fig = px.line(
-                    filtered_df,
-                    x='Date',
-                    y=['Open_Bugs', 'Critical_Bugs'],
-                    color='Project',
-                    title='缺陷趨勢'
-                )
-            st.plotly_chart(fig, use_container_width=True)
+        fig = px.line(
+            downsample_frame(module_trend_df, 'date', 'coverage_percentage', group='module_name'),
+            x='date',
+            y='coverage_percentage',
+            color='module_name',
+            title=f'各模組覆蓋率趨勢{resolution_label}',
+            labels={'coverage_percentage': '覆蓋率(%)'}
+        )
         
-        with tab3:
-            if is_single_day:
-                fig = px.bar(
-                    filtered_df,
-                    x='Project',
-                    y='Code_Coverage',
-                    color='Project',
-                    title=f"{filtered_df['Date'].iloc[0].strftime('%Y/%m/%d')} 代碼覆蓋率",
-                    text='Code_Coverage'
-                )
-                fig.update_traces(texttemplate='%{text:.1f}%', textposition='outside')
-            else:
-                fig = px.line(
-                    filtered_df,
-                    x='Date',
-                    y='Code_Coverage',
-                    color='Project',
-                    title='代碼覆蓋率趨勢'
-                )
-            st.plotly_chart(fig, use_container_width=True)
-            
-        # 顯示Preflight WUT狀態圖 (僅顯示單一專案時)
-        if len(selected_projects) == 1 and all_preflight_wut is not None:
-            with tab4:
-                try:
-                    logging.info(f"開始生成Preflight WUT狀態圖表 - 專案: {selected_projects[0]}")
-                    
-                    # 準備數據
-                    pf_data = all_preflight_wut[all_preflight_wut['Project'] == selected_projects[0]]
-                    logging.debug(f"Preflight WUT原始數據行數: {len(pf_data)}")
-                    
-                    pf_counts = pf_data.groupby(['date', 'type']).size().unstack(fill_value=0)
-                    logging.debug(f"分組後數據: {pf_counts.shape}")
-                    
-                    # 確保所有類型都存在
-                    for col in ['build fail', 'wut fail', 'pass']:
-                        if col not in pf_counts.columns:
-                            logging.warning(f"缺少{col}類型數據，將初始化為0")
-                            pf_counts[col] = 0
-                    
-                    # 重置索引並排序
-                    pf_counts = pf_counts.reset_index().sort_values('date')
-                    logging.debug(f"最終圖表數據: {pf_counts.shape}")
-                    
-                    # 繪製堆疊長條圖
-                    fig = px.bar(
-                        pf_counts,
-                        x='date',
-                        y=['build fail', 'wut fail', 'pass'],
-                        title=f"{selected_projects[0]} Preflight WUT 狀態趨勢",
-                        labels={'value': '數量', 'date': '日期'},
-                        color_discrete_map={
-                            'build fail': '#FF5252',
-                            'wut fail': '#FFD740', 
-                            'pass': '#4CAF50'
-                        },
-                        barmode='stack'
-                    )
-                    st.plotly_chart(fig, use_container_width=True)
-                    logging.info("Preflight WUT狀態圖表生成成功")
-                    
-                except Exception as e:
-                    error_msg = f"繪製Preflight WUT狀態圖時發生錯誤: {str(e)}"
-                    logging.error(error_msg, exc_info=True)
-                    st.error(error_msg)
-    
-    # 資料表格區
+        # 添加總覆蓋率線
+        trend_totals = downsample_frame(trend_totals, 'date', 'total_coverage')
+        fig.add_scatter(
+            x=trend_totals['date'],
+            y=trend_totals['total_coverage'],
+            mode='lines',
+            name='總覆蓋率',
+            line=dict(color='black', width=4, dash='dot')
+        )
+    return fig, None
+
+@st.fragment
+@timed('section:module_coverage')
+def render_module_coverage(selected_projects, start_date, end_date, versions):
+    """模組覆蓋率趨勢 (僅顯示單一專案時)"""
+    if len(selected_projects) != 1:
+        return
     st.markdown("---")
-    st.subheader('詳細資料')
-    st.dataframe(
-        filtered_df.sort_values(['Project', 'Date']),
-        use_container_width=True
+    st.subheader('模組覆蓋率趨勢')
+    
+    project = selected_projects[0]
+    try:
+        fig, size, warning = cached_figure(
+            'module_coverage', (project, start_date, end_date, versions['module_coverage']),
+            lambda: compute_module_coverage_figure(project, start_date, end_date, versions['module_coverage'])
+        )
+    except Exception as e:
+        st.error(f"繪製圖表時發生錯誤: {str(e)}")
+        return
+    if warning:
+        st.warning(warning)
+    else:
+        record_payload('module_coverage', size)
+        st.plotly_chart(fig, use_container_width=True)
+
+# 跨專案模組覆蓋率: 覆蓋率最低模組的可選顯示數量
+WORST_MODULE_COUNTS = [10, 20, 50]
+
+def _natural_order(names):
+    """依名稱長度與名稱排序 (m2 排在 m10 之前)"""
+    return sorted(names, key=lambda name: (len(name), name))
+
+def compute_module_heatmap_figure(projects, start_date, end_date, module_version):
+    """建立模組 x 專案的覆蓋率熱圖 (圖表快取中沒有時才呼叫，見cached_figure)
+    
+    Returns:
+        tuple: (plotly Figure or None, 警告訊息 or None)
+    """
+    coverage = load_module_portfolio(projects, (start_date, end_date), data_version=module_version)
+    if coverage is None:
+        return None, "找不到模組覆蓋率資料"
+    if len(coverage) == 0:
+        return None, "選定日期範圍內無模組覆蓋率數據"
+    
+    matrix = coverage.astype({'Project': str, 'module_name': str}).pivot(
+        index='module_name', columns='Project', values='coverage_percentage'
+    )
+    matrix = matrix.loc[
+        _natural_order(matrix.index), [p for p in projects if p in matrix.columns]
+    ]
+    fig = px.imshow(
+        matrix,
+        color_continuous_scale='RdYlGn',
+        zmin=0,
+        zmax=100,
+        aspect='auto',
+        labels={'x': '專案', 'y': '模組', 'color': '覆蓋率(%)'},
+        title='各專案模組覆蓋率 (期間平均，依月彙總)'
     )
+    return fig, None
+
+def compute_worst_modules_figure(projects, start_date, end_date, module_version, count):
+    """建立所選專案中覆蓋率最低的模組長條圖
     
-    # 模組覆蓋率趨勢 (僅顯示單一專案時)
-    if len(selected_projects) == 1:
-        st.markdown("---")
-        st.subheader('模組覆蓋率趨勢')
-        
-        module_df = load_module_coverage(selected_projects[0])
-        if module_df is not None:
-            # 應用日期篩選
-            filtered_module_df = module_df[
-                (module_df['date'] >= start_date) & 
-                (module_df['date'] <= end_date)
-            ]
-            
-            # 計算總覆蓋率
-            daily_totals = filtered_module_df.groupby('date').agg({
-                'covered_line_number': 'sum',
-                'total_line_number': 'sum'
-            }).reset_index()
-            daily_totals['total_coverage'] = (daily_totals['covered_line_number'] / daily_totals['total_line_number'] * 100).round(2)
-            
-            try:
-                if len(filtered_module_df) == 0:
-                    st.warning("選定日期範圍內無模組覆蓋率數據")
-                    return
-                
-                # 判斷是否為同一天
-                is_single_day = len(filtered_module_df['date'].unique()) == 1
-                
-                if is_single_day:
-                    # 確保有數據
-                    if len(daily_totals) == 0:
-                        st.warning("無法計算總覆蓋率")
-                        return
-                        
-                    # 單日數據 - 使用長條圖
-                    fig = px.bar(
-                        filtered_module_df,
-                        x='module_name',
-                        y='coverage_percentage',
-                        color='module_name',
-                        title=f"{filtered_module_df['date'].iloc[0].strftime('%Y/%m/%d')} 模組覆蓋率",
-                        labels={'coverage_percentage': '覆蓋率(%)'},
-                        text='coverage_percentage'
-                    )
-                    fig.update_traces(texttemplate='%{text:.2f}%', textposition='outside')
-                    
-                    # 添加總覆蓋率橫線
-                    fig.add_hline(
-                        y=daily_totals['total_coverage'].iloc[0],
-                        line_dash="dot",
-                        line_color="black",
-                        annotation_text=f"總覆蓋率: {daily_totals['total_coverage'].iloc[0]:.2f}%",
-                        annotation_position="top right"
-                    )
-                else:
-                    # 多日數據 - 使用折線圖
-                    fig = px.line(
-                        filtered_module_df,
-                        x='date',
-                        y='coverage_percentage',
-                        color='module_name',
-                        title='各模組覆蓋率趨勢',
-                        labels={'coverage_percentage': '覆蓋率(%)'}
-                    )
-                    
-                    # 添加總覆蓋率線
-                    fig.add_scatter(
-                        x=daily_totals['date'],
-                        y=daily_totals['total_coverage'],
-                        mode='lines',
-                        name='總覆蓋率',
-                        line=dict(color='black', width=4, dash='dot')
-                    )
-                st.plotly_chart(fig, use_container_width=True)
-            except Exception as e:
-                st.error(f"繪製圖表時發生錯誤: {str(e)}")
-        else:
-            st.warning("找不到模組覆蓋率資料")
+    Returns:
+        tuple: (plotly Figure or None, 警告訊息 or None)
+    """
+    coverage = load_module_portfolio(projects, (start_date, end_date), data_version=module_version)
+    if coverage is None or len(coverage) == 0:
+        return None, None
+    
+    worst = worst_modules(coverage, count)
+    worst['模組'] = worst['Project'].astype(str) + ' / ' + worst['module_name'].astype(str)
+    fig = px.bar(
+        worst.iloc[::-1],
+        x='coverage_percentage',
+        y='模組',
+        orientation='h',
+        text='coverage_percentage',
+        title=f'覆蓋率最低的 {len(worst)} 個模組',
+        labels={'coverage_percentage': '覆蓋率(%)'}
+    )
+    fig.update_traces(texttemplate='%{text:.2f}%', textposition='outside')
+    fig.update_layout(height=max(400, 24 * len(worst)))
+    return fig, None
+
+@st.fragment
+@timed('section:module_portfolio')
+def render_module_portfolio(selected_projects, start_date, end_date, versions):
+    """跨專案模組覆蓋率比較 (選擇多個專案時)"""
+    if len(selected_projects) < 2:
+        return
+    st.markdown("---")
+    st.subheader('模組覆蓋率比較')
+    
+    projects = tuple(selected_projects)
+    module_version = versions['module_coverage']
+    try:
+        fig, size, warning = cached_figure(
+            'module_heatmap', (projects, start_date, end_date, module_version),
+            lambda: compute_module_heatmap_figure(projects, start_date, end_date, module_version)
+        )
+    except Exception as e:
+        st.error(f"繪製圖表時發生錯誤: {str(e)}")
+        return
+    if warning:
+        st.warning(warning)
+        return
+    record_payload('module_heatmap', size)
+    st.plotly_chart(fig, use_container_width=True)
+    
+    count = st.selectbox('顯示覆蓋率最低的模組數', WORST_MODULE_COUNTS, key='module_worst_count')
+    fig, size, _ = cached_figure(
+        'worst_modules', (projects, start_date, end_date, module_version, count),
+        lambda: compute_worst_modules_figure(projects, start_date, end_date, module_version, count)
+    )
+    if fig is not None:
+        record_payload('worst_modules', size)
+        st.plotly_chart(fig, use_container_width=True)
+
+@st.fragment
+@timed('section:download')
+def render_download(selected_projects, start_date, end_date):
+    """下載區
+    
+    匯出檔在按下下載按鈕時才在背景執行緒產生 (st.download_button的data為函數)，
+    不在rerun中產生，也不保存在session中。
+    """
+    st.markdown("---")
+    st.subheader('資料匯出')
+    if len(selected_projects) == 0:
+        return
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        kind = st.selectbox(
+            '匯出資料', list(EXPORT_DATASETS),
+            format_func=lambda k: EXPORT_DATASETS[k][0], key='export_kind'
+        )
+    with col2:
+        fmt = st.selectbox(
+            '匯出格式', list(EXPORT_FORMATS),
+            format_func=lambda f: EXPORT_FORMATS[f][0], key='export_format'
+        )
+    
+    projects = list(selected_projects)
+    
+    def build_export():
+        try:
+            with span('export'):
+                data = export_bytes(kind, projects, (start_date, end_date), fmt)
+        except Exception as e:
+            logging.error(f"產生匯出檔失敗: {str(e)}", exc_info=True)
+            raise
+        record_payload(f"export:{export_filename(kind, fmt)}", len(data))
+        return data
     
-    # 下載按鈕
     st.download_button(
-        label="下載篩選後資料 (CSV)",
-        data=filtered_df.to_csv(index=False).encode('utf-8'),
-        file_name='filtered_quality_data.csv',
-        mime='text/csv'
+        label=f"下載{EXPORT_DATASETS[kind][0]} ({EXPORT_FORMATS[fmt][0]})",
+        data=build_export,
+        file_name=export_filename(kind, fmt),
+        mime=EXPORT_FORMATS[fmt][2],
+        on_click='ignore',
+        key='export_download'
+    )
+
+# 主程式
+def main():
+    # 初始化logging系統 (每個行程只初始化一次)，並標記本次rerun
+    setup_logging()
+    new_rerun_id()
+    start_rerun()
+    
+    # 載入專案清單與日期範圍 (資料列在篩選條件確定後才讀取)
+    watcher = get_data_watcher()
+    projects, min_date, max_date = load_catalog(watcher.version())
+    
+    with span('sidebar_filters'):
+        selected_projects, date_range, start_date, end_date = sidebar_filters(projects, min_date, max_date)
+    
+    # 強制使用亮色主題
+    theme = '亮色'
+    
+    # 各區塊的資料版本 (只有選定專案的資料變動時才改變)
+    versions = {kind: watcher.version(kind, selected_projects) for kind in KINDS}
+    
+    # 只讀取選定專案與日期範圍內的資料
+    filtered_df = load_all_projects(
+        tuple(selected_projects), (start_date, end_date), data_version=versions['qa']
     )
+    
+    # 載入preflight_wut每日筆數 (概覽卡片與狀態圖共用)
+    preflight_counts = None
+    if len(selected_projects) > 0:
+        preflight_counts = load_preflight_counts(
+            tuple(selected_projects), (start_date, end_date), data_version=versions['preflight_wut']
+        )
+    
+    report_memory({'專案數據': filtered_df, 'Preflight WUT 筆數': preflight_counts})
+    
+    # 主頁面標題
+    st.title('軟體品質儀表板')
+    st.markdown("---")
+    
+    # 各區塊只依賴明確傳入的篩選條件與資料版本，輸入未改變的區塊直接使用快取結果
+    render_overview(selected_projects, date_range, start_date, end_date, versions)
+    render_trends(selected_projects, start_date, end_date, versions)
+    render_detail_table(selected_projects, start_date, end_date, versions)
+    render_module_coverage(selected_projects, start_date, end_date, versions)
+    render_module_portfolio(selected_projects, start_date, end_date, versions)
+    render_download(selected_projects, start_date, end_date)
+    
+    # 記錄本次rerun的效能摘要 (JSON日誌)，?perf=1 時顯示效能面板
+    summary = finish_rerun()
+    if perf_enabled():
+        render_perf_panel(summary)
 
 if __name__ == '__main__':
     main()
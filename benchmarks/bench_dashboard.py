@@ -0,0 +1,256 @@
+"""儀表板基準量測
+
+以utils/data_generator.py生成 N個專案 x M天 x K個模組 的合成資料，
+在Streamlit伺服器之外 (headless) 量測資料匯入、讀取、篩選、品質評分、
+preflight彙總與圖表建立各階段的耗時，結果寫成JSON以便跨commit比較。
+
+使用範例:
+    $ python -m benchmarks.bench_dashboard --projects 50 --days 730 --modules 20
+    $ python -m benchmarks.bench_dashboard --compare benchmarks/results/base.json
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from utils import data_generator  # noqa: E402
+from utils.data_store import STORE_DIR, read_dataset, sync_store  # noqa: E402
+from utils.downsampling import downsample_frame  # noqa: E402
+from utils.indexes import ProjectDateIndex, project_date_index, read_indexed  # noqa: E402
+from utils.preflight import aggregate_preflight  # noqa: E402
+from utils.project_config import init_project_config, load_all_project_configs  # noqa: E402
+from utils.quality_metrics import calculate_quality_scores  # noqa: E402
+from utils.rollups import ROLLUP_DIR, pick_resolution, read_rollup, sync_rollups  # noqa: E402
+from utils.summaries import portfolio_module_coverage  # noqa: E402
+
+RESULTS_DIR = REPO_ROOT / 'benchmarks' / 'results'
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def measure(func, repeat, setup=None):
+    """重複執行並返回各次耗時 (秒) 與最後一次的結果
+
+    Args:
+        func (callable): 要量測的函數
+        repeat (int): 重複次數
+        setup (callable, optional): 每次量測前執行 (不計時)，例如清除快取檔
+    """
+    timings = []
+    result = None
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return timings, result
+
+
+def _summary(timings, rows=None):
+    entry = {
+        'repeat': len(timings),
+        'min_s': round(min(timings), 6),
+        'median_s': round(statistics.median(timings), 6),
+        'mean_s': round(statistics.mean(timings), 6),
+    }
+    if rows is not None:
+        entry['rows'] = int(rows)
+    return entry
+
+
+def _rows(result):
+    return len(result) if isinstance(result, pd.DataFrame) else None
+
+
+def generate(workdir, args):
+    """在workdir/data下生成合成資料並建立預設專案配置"""
+    start_date = datetime(2024, 1, 1)
+    end_date = start_date + timedelta(days=args.days - 1)
+    projects = data_generator.generate_dataset(
+        args.projects, start_date, end_date, args.modules, args.preflight_per_day,
+        data_dir=str(Path(workdir) / 'data'), preflight=True, seed=args.seed
+    )
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        for project in projects:
+            init_project_config(project)
+    finally:
+        os.chdir(cwd)
+    return projects, start_date, end_date
+
+
+def run_benchmarks(projects, start_date, end_date, repeat):
+    """依序量測各階段 (需在資料目錄的上一層執行)
+
+    Returns:
+        dict: {階段名稱: 量測摘要}
+    """
+    results = {}
+
+    def record(name, func, setup=None, n=repeat):
+        timings, result = measure(func, n, setup)
+        results[name] = _summary(timings, _rows(result))
+        print(f"{name:<28} median {results[name]['median_s'] * 1000:10.2f} ms")
+        return result
+
+    def clear_store():
+        shutil.rmtree(STORE_DIR, ignore_errors=True)
+
+    def clear_rollups():
+        shutil.rmtree(ROLLUP_DIR, ignore_errors=True)
+
+    # 匯入: 冷啟動 (全部CSV轉Parquet) 與無變動時的檢查
+    record('ingest_cold', sync_store, setup=clear_store)
+    record('ingest_noop', sync_store)
+    record('rollups_cold', sync_rollups, setup=clear_rollups)
+    record('rollups_noop', sync_rollups)
+
+    # 讀取
+    qa_df = record('load_qa_all', lambda: read_dataset('qa'))
+    record('load_module_one', lambda: read_dataset('module_coverage', [projects[0]]))
+    preflight_df = record('load_preflight_all', lambda: read_dataset('preflight_wut'))
+
+    # 篩選: 最近90天、前10個專案 (下推到Parquet讀取)
+    recent = (pd.Timestamp(end_date) - pd.Timedelta(days=89), pd.Timestamp(end_date))
+    record('filter_recent_90d', lambda: read_dataset('qa', projects[:10], date_range=recent))
+    # 記憶體內索引: 冷啟動 (載入並排序所有專案) 與二分搜尋切片
+    record('index_build_qa', lambda: ProjectDateIndex('qa').slice(projects))
+    project_date_index('qa').slice(projects[:10])
+    record('filter_recent_90d_indexed', lambda: read_indexed('qa', projects[:10], date_range=recent))
+
+    # 品質評分與preflight彙總
+    configs = load_all_project_configs()
+    record('score_batch', lambda: calculate_quality_scores(qa_df, configs))
+    record('preflight_aggregate', lambda: aggregate_preflight(preflight_df))
+
+    # 圖表: 全期間趨勢圖 (rollup + 降採樣 + 序列化) 與單一專案模組覆蓋率
+    full_range = (pd.Timestamp(start_date), pd.Timestamp(end_date))
+    resolution = pick_resolution(*full_range)
+
+    def trend_figure():
+        trend_df = read_rollup('qa', resolution, projects, full_range)
+        fig = px.line(
+            downsample_frame(trend_df, 'Date', 'Pass_Rate(%)', group='Project'),
+            x='Date', y='Pass_Rate(%)', color='Project'
+        )
+        return fig.to_json()
+
+    def module_figure():
+        module_df = read_rollup('module_coverage', resolution, [projects[0]], full_range)
+        fig = px.line(
+            downsample_frame(module_df, 'date', 'coverage_percentage', group='module_name'),
+            x='date', y='coverage_percentage', color='module_name'
+        )
+        return fig.to_json()
+
+    # 跨專案模組覆蓋率 (單一彙總表)
+    record('module_portfolio', lambda: portfolio_module_coverage(projects, full_range))
+
+    payload = record('figure_trend', trend_figure)
+    results['figure_trend']['payload_bytes'] = len(payload)
+    payload = record('figure_module_coverage', module_figure)
+    results['figure_module_coverage']['payload_bytes'] = len(payload)
+    return results
+
+
+def compare(results, baseline_path):
+    """列出與基準結果的中位數比值 (>1 表示變慢)"""
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = json.load(f)
+    print(f"\n比較基準: {baseline_path} (commit {baseline['meta'].get('git_commit')})")
+    for name, entry in results.items():
+        base = baseline['results'].get(name)
+        if base is None:
+            print(f"{name:<28} (基準中沒有此項目)")
+            continue
+        ratio = entry['median_s'] / base['median_s'] if base['median_s'] else float('inf')
+        print(f"{name:<28} {base['median_s'] * 1000:10.2f} ms -> {entry['median_s'] * 1000:10.2f} ms  x{ratio:.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='軟體品質儀表板基準量測')
+    parser.add_argument('--projects', type=int, default=20, help='專案數量 (N)')
+    parser.add_argument('--days', type=int, default=365, help='資料天數 (M)')
+    parser.add_argument('--modules', type=int, default=6, help='每個專案的模組數量 (K)')
+    parser.add_argument('--preflight-per-day', type=int, default=10, help='每個工作日最多的preflight結果筆數')
+    parser.add_argument('--repeat', type=int, default=5, help='每個階段的重複次數')
+    parser.add_argument('--seed', type=int, default=0, help='合成資料的亂數種子')
+    parser.add_argument('--workdir', help='合成資料目錄 (指定時保留，未指定時使用暫存目錄)')
+    parser.add_argument('--output', help='結果JSON路徑 (預設 benchmarks/results/<時間>_<commit>.json)')
+    parser.add_argument('--compare', help='與此基準結果JSON比較')
+    args = parser.parse_args(argv)
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix='qa_dashboard_bench_')
+    Path(workdir).mkdir(parents=True, exist_ok=True)
+    commit = _git_commit()
+
+    start = time.perf_counter()
+    projects, start_date, end_date = generate(workdir, args)
+    generate_seconds = time.perf_counter() - start
+    print(f"已生成 {len(projects)} 個專案 x {args.days} 天 x {args.modules} 個模組 ({generate_seconds:.1f} s): {workdir}")
+
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        results = run_benchmarks(projects, start_date, end_date, args.repeat)
+    finally:
+        os.chdir(cwd)
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'git_commit': commit,
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'params': {
+                'projects': args.projects, 'days': args.days, 'modules': args.modules,
+                'preflight_per_day': args.preflight_per_day, 'repeat': args.repeat, 'seed': args.seed,
+            },
+            'generate_s': round(generate_seconds, 3),
+        },
+        'results': results,
+    }
+
+    output = Path(args.output) if args.output else (
+        RESULTS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}_{commit}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"結果已寫入 {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
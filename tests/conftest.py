@@ -0,0 +1,69 @@
+"""測試共用的fixture
+
+每個fixture在暫存目錄下以utils/data_generator.py生成小型合成資料集並切換工作目錄
+(data_store、project_config皆以相對路徑 data/ 讀寫)，測試不會讀寫專案本身的data目錄。
+"""
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from utils import data_generator, indexes  # noqa: E402
+from utils.data_store import sync_store  # noqa: E402
+from utils.project_config import init_project_config  # noqa: E402
+
+PROJECTS = ['project1', 'project2', 'project3']
+START_DATE = datetime(2024, 1, 1)
+END_DATE = datetime(2024, 5, 31)
+
+
+def make_dataset(root, seed=0):
+    """在root/data下生成合成資料與預設專案配置
+
+    project2的品質指標CSV打亂列順序並加入重複日期，用於驗證依日期的穩定排序。
+    """
+    data_generator.generate_dataset(
+        len(PROJECTS), START_DATE, END_DATE, modules=3, preflight_per_day=5,
+        data_dir=str(root / 'data'), preflight=True, seed=seed
+    )
+    path = root / 'data' / 'project2' / 'sample_qa_dashboard.csv'
+    df = pd.read_csv(path)
+    duplicates = df.iloc[::10].assign(Open_Bugs=lambda d: d['Open_Bugs'] + 1)
+    pd.concat([df, duplicates]).sample(frac=1, random_state=seed).to_csv(path, index=False)
+    for project in PROJECTS:
+        init_project_config(project)
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """已生成資料、尚未同步的工作目錄 (每個測試各自一份)"""
+    monkeypatch.chdir(tmp_path)
+    make_dataset(tmp_path)
+    monkeypatch.setattr(indexes, '_indexes', {})
+    return tmp_path
+
+
+@pytest.fixture(scope='module')
+def synced_store(tmp_path_factory):
+    """已同步儲存與rollup的工作目錄 (同一模組的測試共用，只可讀取)"""
+    from utils.rollups import sync_rollups
+
+    root = tmp_path_factory.mktemp('store')
+    cwd = os.getcwd()
+    os.chdir(root)
+    saved_indexes = indexes._indexes
+    indexes._indexes = {}
+    try:
+        make_dataset(root)
+        sync_store(workers=1)
+        sync_rollups()
+        yield root
+    finally:
+        indexes._indexes = saved_indexes
+        os.chdir(cwd)
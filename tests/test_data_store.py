@@ -0,0 +1,122 @@
+"""sync_store的增量同步: 無變動、內容變動、只有mtime變動、匯入失敗與來源移除"""
+import os
+from pathlib import Path
+
+import pandas as pd
+
+from tests.conftest import PROJECTS
+from utils.data_store import (
+    MANIFEST_PATH, ingest_failures, last_ingest_report, list_projects, read_dataset, source_versions, sync_store
+)
+
+QA_SOURCE = 'data/project1/sample_qa_dashboard.csv'
+
+
+def _touch(path, offset_ns=10**9):
+    """將mtime往後調整 (避免與上次同步在同一個時間刻度內)"""
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + offset_ns))
+
+
+def test_initial_sync_ingests_every_source(workdir):
+    changed = sync_store(workers=1)
+    assert len(changed) == len(PROJECTS) * 3
+    assert list_projects('qa') == PROJECTS
+    assert all(item['ingested'] and item['error'] is None for item in last_ingest_report())
+    assert len(read_dataset('qa', 'project1')) == len(pd.read_csv(QA_SOURCE))
+
+
+def test_noop_sync_keeps_manifest(workdir):
+    sync_store(workers=1)
+    report = last_ingest_report()
+    mtime_ns = MANIFEST_PATH.stat().st_mtime_ns
+
+    assert sync_store(workers=1) == []
+    assert MANIFEST_PATH.stat().st_mtime_ns == mtime_ns
+    # 沒有待同步檔案的同步不覆蓋上一次的匯入結果
+    assert last_ingest_report() == report
+
+
+def test_changed_source_is_reingested(workdir):
+    sync_store(workers=1)
+    versions = source_versions('qa')
+    df = pd.read_csv(QA_SOURCE)
+    df.iloc[:-3].to_csv(QA_SOURCE, index=False)
+    _touch(QA_SOURCE)
+
+    assert sync_store(workers=1) == [QA_SOURCE]
+    assert len(read_dataset('qa', 'project1')) == len(df) - 3
+    new_versions = source_versions('qa')
+    assert new_versions['project1'] != versions['project1']
+    assert {p: v for p, v in new_versions.items() if p != 'project1'} == {
+        p: v for p, v in versions.items() if p != 'project1'
+    }
+
+
+def test_mtime_only_change_is_not_reingested(workdir):
+    sync_store(workers=1)
+    versions = source_versions('qa')
+    _touch(QA_SOURCE)
+
+    assert sync_store(workers=1) == []
+    assert [item['ingested'] for item in last_ingest_report()] == [False]
+    assert source_versions('qa') == versions
+    # 新的mtime已記錄，下次同步沒有待同步的檔案 (不再計算雜湊)
+    mtime_ns = MANIFEST_PATH.stat().st_mtime_ns
+    assert sync_store(workers=1) == []
+    assert MANIFEST_PATH.stat().st_mtime_ns == mtime_ns
+
+
+def test_failed_source_is_skipped_until_it_changes(workdir):
+    sync_store(workers=1)
+    rows = len(read_dataset('qa', 'project1'))
+    original = Path(QA_SOURCE).read_bytes()
+    Path(QA_SOURCE).write_text('garbage\n1\n', encoding='utf-8')
+    _touch(QA_SOURCE)
+
+    assert sync_store(workers=1) == []
+    report = last_ingest_report()
+    assert len(report) == 1 and report[0]['error']
+    assert [failure['source'] for failure in ingest_failures()] == [QA_SOURCE]
+    # 既有分區仍可讀取
+    assert len(read_dataset('qa', 'project1')) == rows
+
+    # 檔案未再變動: 不重試，也不重寫manifest
+    mtime_ns = MANIFEST_PATH.stat().st_mtime_ns
+    assert sync_store(workers=1) == []
+    assert MANIFEST_PATH.stat().st_mtime_ns == mtime_ns
+    assert last_ingest_report() == report
+
+    # 修正後 (內容與上次成功匯入相同) 清除失敗紀錄
+    Path(QA_SOURCE).write_bytes(original)
+    _touch(QA_SOURCE, 2 * 10**9)
+    assert sync_store(workers=1) == []
+    assert ingest_failures() == []
+    assert len(read_dataset('qa', 'project1')) == rows
+
+
+def test_new_source_that_fails_is_not_listed(workdir):
+    sync_store(workers=1)
+    Path('data/project9').mkdir()
+    Path('data/project9/sample_qa_dashboard.csv').write_text('Date,foo\nnot-a-date,1\n', encoding='utf-8')
+
+    assert sync_store(workers=1) == []
+    assert 'project9' not in list_projects('qa')
+    assert 'project9' not in source_versions('qa')
+    assert [failure['project'] for failure in ingest_failures()] == ['project9']
+
+
+def test_removed_source_drops_partitions(workdir):
+    sync_store(workers=1)
+    os.remove('data/project3/module_coverage.csv')
+
+    assert sync_store(workers=1) == ['data/project3/module_coverage.csv']
+    assert 'project3' not in list_projects('module_coverage')
+    assert read_dataset('module_coverage', 'project3') is None
+    assert 'project3' in list_projects('qa')
+
+
+def test_parallel_sync_matches_sequential(workdir):
+    sync_store(workers=4, executor='thread')
+    for project in PROJECTS:
+        assert len(read_dataset('qa', project)) == len(pd.read_csv(f'data/{project}/sample_qa_dashboard.csv'))
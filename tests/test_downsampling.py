@@ -0,0 +1,61 @@
+"""降採樣後每條曲線不超過點數上限，並保留首尾點與極值"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.downsampling import downsample_frame, lttb_indices, minmax_indices
+
+
+@pytest.fixture
+def trend_df():
+    """兩條長度不同的曲線 (資料列依專案交錯、日期未排序)"""
+    rng = np.random.default_rng(0)
+    frames = [
+        pd.DataFrame({
+            'Project': project,
+            'Date': pd.date_range('2022-01-01', periods=n),
+            'Pass_Rate(%)': rng.normal(90, 3, n).round(2),
+            'Code_Coverage': rng.normal(70, 5, n).round(1),
+        })
+        for project, n in (('project1', 1000), ('project2', 400))
+    ]
+    return pd.concat(frames, ignore_index=True).sample(frac=1, random_state=0)
+
+
+@pytest.mark.parametrize('method', ['minmax', 'lttb'])
+def test_each_trace_within_budget(trend_df, method):
+    result = downsample_frame(trend_df, 'Date', 'Pass_Rate(%)', group='Project', max_points=120, method=method)
+    for project, part in result.groupby('Project'):
+        original = trend_df[trend_df['Project'] == project].sort_values('Date')
+        assert len(part) <= 120
+        # 保留的資料列為原資料的子集合，且包含首尾點
+        assert part['Date'].min() == original['Date'].iloc[0]
+        assert part['Date'].max() == original['Date'].iloc[-1]
+        assert part['Date'].isin(original['Date']).all()
+        if method == 'minmax':
+            assert part['Pass_Rate(%)'].max() == original['Pass_Rate(%)'].max()
+            assert part['Pass_Rate(%)'].min() == original['Pass_Rate(%)'].min()
+
+
+def test_multiple_columns_keep_extremes(trend_df):
+    result = downsample_frame(trend_df, 'Date', ['Pass_Rate(%)', 'Code_Coverage'], group='Project', max_points=120)
+    for project, part in result.groupby('Project'):
+        original = trend_df[trend_df['Project'] == project]
+        assert len(part) <= 120
+        for column in ('Pass_Rate(%)', 'Code_Coverage'):
+            assert part[column].max() == original[column].max()
+            assert part[column].min() == original[column].min()
+
+
+def test_under_budget_returns_input(trend_df):
+    result = downsample_frame(trend_df, 'Date', 'Pass_Rate(%)', group='Project', max_points=1000)
+    pd.testing.assert_frame_equal(result, trend_df.reset_index(drop=True))
+
+
+@pytest.mark.parametrize('n, max_points', [(10, 20), (500, 50), (501, 7)])
+def test_indices_sorted_and_bounded(n, max_points):
+    y = np.random.default_rng(n).normal(size=n)
+    for indices in (minmax_indices(y, max_points), lttb_indices(np.arange(n), y, max_points)):
+        assert len(indices) <= min(n, max_points)
+        assert np.all(np.diff(indices) > 0)
+        assert indices[0] == 0 and indices[-1] == n - 1
@@ -0,0 +1,87 @@
+"""ProjectDateIndex的二分搜尋切片與最新一列，和Parquet讀取後以布林遮罩篩選的結果一致"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from tests.conftest import PROJECTS
+from utils.data_store import read_dataset
+from utils.indexes import ProjectDateIndex
+
+DATE_RANGES = [
+    (None, None),
+    ('2024-02-10', '2024-04-05'),
+    ('2024-03-03', '2024-03-03'),      # 單日 (可能沒有資料)
+    ('2023-06-01', '2024-01-15'),      # 開始早於資料
+    ('2024-05-20', '2025-01-01'),      # 結束晚於資料
+    ('2025-01-01', '2025-02-01'),      # 完全在資料範圍外
+]
+
+
+def _masked(kind, projects, start, end, columns=None):
+    """預期結果: 讀取全部資料，以布林遮罩篩選後依專案順序與日期穩定排序"""
+    date_column = 'Date' if kind == 'qa' else 'date'
+    frames = []
+    for project in projects:
+        df = read_dataset(kind, project)
+        df = df.iloc[np.argsort(df[date_column].to_numpy(), kind='stable')]
+        mask = np.ones(len(df), dtype=bool)
+        if start is not None:
+            mask &= (df[date_column] >= pd.Timestamp(start)).to_numpy()
+        if end is not None:
+            mask &= (df[date_column] <= pd.Timestamp(end)).to_numpy()
+        frames.append(df[mask])
+    df = pd.concat(frames, ignore_index=True)
+    if columns is not None:
+        df = df[columns + ['Project']]
+    return df
+
+
+def _normalize(df):
+    df = df.reset_index(drop=True)
+    df['Project'] = df['Project'].astype(str)
+    for column in df.columns:
+        if df[column].dtype == 'category':
+            df[column] = df[column].astype(str)
+    return df[sorted(df.columns)]
+
+
+@pytest.mark.parametrize('kind', ['qa', 'module_coverage'])
+@pytest.mark.parametrize('start, end', DATE_RANGES)
+def test_slice_matches_mask(synced_store, kind, start, end):
+    index = ProjectDateIndex(kind)
+    result = index.slice(PROJECTS, start, end)
+    expected = _masked(kind, PROJECTS, start, end)
+    assert len(result) == len(expected)
+    if len(expected):
+        pd.testing.assert_frame_equal(_normalize(result), _normalize(expected), check_dtype=False)
+        assert list(result['Project'].cat.categories) == PROJECTS
+
+
+def test_slice_columns_and_project_order(synced_store):
+    index = ProjectDateIndex('qa')
+    projects = ['project3', 'project1']
+    result = index.slice(projects, '2024-02-01', '2024-02-29', columns=['Date', 'Open_Bugs'])
+    expected = _masked('qa', projects, '2024-02-01', '2024-02-29', columns=['Date', 'Open_Bugs'])
+    assert list(result.columns) == ['Date', 'Open_Bugs', 'Project']
+    pd.testing.assert_frame_equal(_normalize(result), _normalize(expected), check_dtype=False)
+
+
+def test_slice_unknown_project(synced_store):
+    assert ProjectDateIndex('qa').slice(['project_missing']) is None
+
+
+@pytest.mark.parametrize('start, end', DATE_RANGES)
+def test_latest_matches_mask(synced_store, start, end):
+    result = ProjectDateIndex('qa').latest(PROJECTS, start, end)
+    expected = _masked('qa', PROJECTS, start, end).groupby('Project', observed=True, sort=False).tail(1)
+    pd.testing.assert_frame_equal(_normalize(result), _normalize(expected), check_dtype=False)
+
+
+def test_memory_bound_evicts_unrequested_projects(synced_store):
+    index = ProjectDateIndex('qa', max_bytes=1)
+    index.slice(['project1'])
+    index.slice(['project2'])
+    loaded, _ = index.memory_usage()
+    # 超過上限時只保留本次要求的專案
+    assert loaded == 1
+    assert len(index.slice(['project1', 'project2'])) == len(_masked('qa', ['project1', 'project2'], None, None))
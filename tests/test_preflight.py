@@ -0,0 +1,62 @@
+"""aggregate_preflight的bincount彙總與groupby計數的結果一致"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.preflight import COUNT_COLUMNS, PREFLIGHT_TYPES, aggregate_preflight, counts_by_period, preflight_totals
+
+
+@pytest.fixture
+def preflight_df():
+    """兩個專案的隨機preflight結果，含不在PREFLIGHT_TYPES內的類型"""
+    rng = np.random.default_rng(0)
+    n = 2000
+    types = np.array(list(PREFLIGHT_TYPES) + ['skipped'])
+    return pd.DataFrame({
+        'Project': pd.Categorical(rng.choice(['project2', 'project1'], n)),
+        'date': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 90, n), unit='D'),
+        'type': types[rng.integers(0, len(types), n)],
+    })
+
+
+def _expected(df):
+    """預期結果: 以groupby逐類型計數後展開成欄位"""
+    counts = (
+        df.assign(Project=df['Project'].astype(str))
+        .groupby(['Project', 'date', 'type']).size()
+        .unstack('type', fill_value=0)
+    )
+    expected = counts.reindex(columns=list(PREFLIGHT_TYPES), fill_value=0)
+    expected['total'] = counts.sum(axis=1)
+    return expected.reset_index().rename_axis(columns=None)
+
+
+def test_aggregate_matches_groupby(preflight_df):
+    result = aggregate_preflight(preflight_df)
+    result = result.assign(Project=result['Project'].astype(str))
+    pd.testing.assert_frame_equal(result, _expected(preflight_df), check_dtype=False)
+
+
+def test_aggregate_empty():
+    counts = aggregate_preflight(None)
+    assert list(counts.columns) == ['Project', 'date'] + COUNT_COLUMNS
+    assert len(counts) == 0
+
+
+def test_totals_match_raw_counts(preflight_df):
+    totals = preflight_totals(aggregate_preflight(preflight_df))
+    for project, part in preflight_df.groupby('Project', observed=True):
+        assert totals.loc[project, 'total'] == len(part)
+        for preflight_type in PREFLIGHT_TYPES:
+            assert totals.loc[project, preflight_type] == (part['type'] == preflight_type).sum()
+
+
+@pytest.mark.parametrize('resolution, code', [('weekly', 'W-SUN'), ('monthly', 'M')])
+def test_counts_by_period_matches_groupby(preflight_df, resolution, code):
+    result = counts_by_period(aggregate_preflight(preflight_df), resolution)
+    period_df = preflight_df.assign(date=preflight_df['date'].dt.to_period(code).dt.start_time)
+    expected = _expected(period_df)
+
+    assert result['date'].is_monotonic_increasing
+    result = result.assign(Project=result['Project'].astype(str)).sort_values(['Project', 'date'])
+    pd.testing.assert_frame_equal(result.reset_index(drop=True), expected, check_dtype=False)
@@ -0,0 +1,65 @@
+"""批次品質評分 (calculate_quality_scores) 與逐列評分 (calculate_quality_score) 的一致性"""
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.data_store import read_dataset
+from utils.project_config import load_project_config
+from utils.quality_metrics import calculate_quality_score, calculate_quality_scores
+
+
+def _scalar_scores(df):
+    """對每一列呼叫calculate_quality_score (缺值以None傳入)"""
+    scores = []
+    for row in df.to_dict('records'):
+        metrics = {key: (None if pd.isna(value) else value) for key, value in row.items() if key != 'Project'}
+        scores.append(calculate_quality_score(str(row['Project']), metrics))
+    return pd.DataFrame(scores, index=df.index)
+
+
+@pytest.fixture
+def scored_frame(workdir):
+    """含不同配置 (閾值、方向、權重、等級表)、沒有配置的專案與缺值的資料"""
+    with open('data/project2/config.json', encoding='utf-8') as f:
+        config = json.load(f)
+    config['metrics']['Open_Bugs'] = {'threshold': 15, 'higher_better': False}
+    config['metrics']['Test_Executed'] = {'threshold': 0, 'higher_better': True}
+    config['weights'].update({'Open_Bugs': 0.35, 'Pass_Rate(%)': 0.15, 'Test_Executed': 0.1})
+    config['style_rules'] = {'grade_scale': {'S': 110, 'A': 95, 'B': 75, 'F': 0}}
+    with open('data/project2/config.json', 'w', encoding='utf-8') as f:
+        json.dump(config, f)
+
+    from utils.data_store import sync_store
+    sync_store(workers=1)
+    df = read_dataset('qa').reset_index(drop=True)
+    df['Project'] = df['Project'].astype(str)
+    # 沒有配置的專案與缺值
+    df.loc[df.index[:5], 'Project'] = 'project_without_config'
+    df.loc[df.index[10:20], 'Code_Coverage'] = np.nan
+    df.loc[df.index[20:25], ['Pass_Rate(%)', 'Open_Bugs', 'Critical_Bugs', 'Code_Coverage']] = np.nan
+    return df
+
+
+def test_batch_matches_scalar(scored_frame):
+    configs = {project: load_project_config(project) for project in scored_frame['Project'].unique()}
+    batch = calculate_quality_scores(scored_frame, configs)
+    expected = _scalar_scores(scored_frame)
+
+    assert batch.index.equals(scored_frame.index)
+    np.testing.assert_array_equal(batch['score'].to_numpy(dtype=float), expected['score'].to_numpy(dtype=float))
+    assert batch['grade'].tolist() == expected['grade'].tolist()
+    assert set(batch['grade']) >= {'N/A'}
+
+
+def test_batch_loads_configs_when_not_given(scored_frame):
+    pd.testing.assert_frame_equal(
+        calculate_quality_scores(scored_frame),
+        calculate_quality_scores(scored_frame, {p: load_project_config(p) for p in scored_frame['Project'].unique()})
+    )
+
+
+def test_categorical_project_column(scored_frame):
+    categorical = scored_frame.assign(Project=scored_frame['Project'].astype('category'))
+    pd.testing.assert_frame_equal(calculate_quality_scores(categorical), calculate_quality_scores(scored_frame))
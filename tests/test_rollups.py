@@ -0,0 +1,50 @@
+"""read_rollup的週/月彙總與直接彙總範圍內每日原始資料的結果一致 (兩端不完整的週期不含範圍外數值)"""
+import pandas as pd
+import pytest
+
+from tests.conftest import PROJECTS
+from utils.data_store import KINDS, read_dataset
+from utils.rollups import _BUILDERS, pick_resolution, read_rollup
+
+DATE_RANGES = [
+    ('2024-01-01', '2024-05-31'),      # 全期間
+    ('2024-02-14', '2024-04-17'),      # 兩端皆為不完整的週/月
+    ('2024-03-06', '2024-03-06'),      # 單日
+    ('2024-04-01', '2024-04-30'),      # 剛好一個完整月份
+]
+
+
+def _sorted(df, kind):
+    keys = [column for column in ('Project', 'module_name') if column in df.columns]
+    keys.append(KINDS[kind]['date_column'])
+    df = df.assign(**{column: df[column].astype(str) for column in keys[:-1]})
+    return df.sort_values(keys).reset_index(drop=True)[sorted(df.columns)]
+
+
+@pytest.mark.parametrize('kind', list(_BUILDERS))
+@pytest.mark.parametrize('resolution', ['daily', 'weekly', 'monthly'])
+@pytest.mark.parametrize('start, end', DATE_RANGES)
+def test_read_rollup_matches_raw_aggregation(synced_store, kind, resolution, start, end):
+    date_range = (pd.Timestamp(start), pd.Timestamp(end))
+    raw = read_dataset(kind, PROJECTS, date_range=date_range)
+    raw = raw.assign(Project=raw['Project'].astype(str))
+    expected = _BUILDERS[kind](raw, resolution)
+
+    result = read_rollup(kind, resolution, PROJECTS, date_range)
+
+    # 類別依傳入的專案順序，只含範圍內有資料的專案
+    assert list(result['Project'].cat.categories) == [p for p in PROJECTS if p in set(raw['Project'])]
+    pd.testing.assert_frame_equal(
+        _sorted(result, kind), _sorted(expected, kind), check_dtype=False, rtol=1e-5
+    )
+
+
+def test_read_rollup_without_store_returns_none(synced_store):
+    assert read_rollup('qa', 'monthly', ['no_such_project']) is None
+
+
+@pytest.mark.parametrize('days, expected', [(1, 'daily'), (120, 'daily'), (121, 'weekly'), (840, 'weekly'),
+                                            (841, 'monthly')])
+def test_pick_resolution(days, expected):
+    start = pd.Timestamp('2024-01-01')
+    assert pick_resolution(start, start + pd.Timedelta(days=days - 1), max_points=120) == expected
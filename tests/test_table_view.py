@@ -0,0 +1,55 @@
+"""sort_order / apply_filter / page_rows與DataFrame穩定排序及布林遮罩的結果一致"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.table_view import apply_filter, page_count, page_rows, sort_order
+
+
+@pytest.fixture
+def table_df():
+    rng = np.random.default_rng(0)
+    n = 500
+    return pd.DataFrame({
+        'Project': pd.Categorical(rng.choice(['project10', 'project2', 'project1'], n),
+                                  categories=['project2', 'project10', 'project1']),
+        'Date': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 60, n), unit='D'),
+        'Pass_Rate(%)': rng.integers(80, 100, n).astype(float),
+    })
+
+
+@pytest.mark.parametrize('columns', ['Project', 'Pass_Rate(%)', ['Project', 'Date'], ['Pass_Rate(%)', 'Project']])
+@pytest.mark.parametrize('ascending', [True, False])
+def test_sort_order_matches_stable_sort(table_df, columns, ascending):
+    keys = [columns] if isinstance(columns, str) else columns
+    # 類別欄位依類別名稱排序
+    comparable = table_df.assign(Project=table_df['Project'].astype(str))
+    expected = comparable.sort_values(keys, ascending=ascending, kind='stable').index.to_numpy()
+    np.testing.assert_array_equal(sort_order(table_df, columns, ascending), expected)
+
+
+@pytest.mark.parametrize('column, query, mask', [
+    ('Pass_Rate(%)', '>=90', lambda df: df['Pass_Rate(%)'] >= 90),
+    ('Pass_Rate(%)', '85..88', lambda df: df['Pass_Rate(%)'].between(85, 88)),
+    ('Date', '2024-02', lambda df: df['Date'].dt.month == 2),
+    ('Project', 'PROJECT1', lambda df: df['Project'].astype(str).str.startswith('project1')),
+])
+def test_apply_filter_keeps_order(table_df, column, query, mask):
+    order = sort_order(table_df, ['Date', 'Project'])
+    result = apply_filter(table_df, order, column, query)
+    np.testing.assert_array_equal(result, order[mask(table_df).to_numpy()[order]])
+
+
+def test_invalid_numeric_filter(table_df):
+    with pytest.raises(ValueError):
+        apply_filter(table_df, np.arange(len(table_df)), 'Pass_Rate(%)', 'abc')
+
+
+def test_page_rows(table_df):
+    order = sort_order(table_df, 'Date', ascending=False)
+    pages = page_count(len(order), 50)
+    assert pages == 10
+    combined = pd.concat([page_rows(table_df, order, page, 50) for page in range(1, pages + 1)])
+    pd.testing.assert_frame_equal(combined, table_df.iloc[order])
+    assert len(page_rows(table_df, order, pages + 1, 50)) == 0
+    assert page_count(0, 50) == 1
@@ -1,120 +1,188 @@
-import pandas as pd
-import numpy as np
-from datetime import datetime, timedelta
+"""合成資料生成
+
+以NumPy陣列一次抽樣所有資料列 (numpy.random.Generator，可指定種子重現)，
+生成每個專案的品質指標、模組覆蓋率與preflight結果，輸出為CSV或Parquet。
+
+使用範例:
+    $ python -m utils.data_generator                       # 預設10個專案
+    $ python -m utils.data_generator --projects 200 --days 730 --modules 30 --seed 1
+    $ python -m utils.data_generator --format parquet --data-dir /tmp/fixtures
+"""
+import argparse
 import os
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+
+# 沒有preflight資料的專案 (預設資料集)
+NO_PREFLIGHT_PROJECTS = ['project1', 'project3', 'project5']
 
-def generate_module_coverage_data(project_name):
-    start_date = datetime(2024, 2, 1)
-    end_date = datetime(2025, 12, 1)
+# 失敗案例類型
+FAIL_CASES = np.array([
+    'TimeoutError',
+    'AssertionError',
+    'NetworkError',
+    'ValidationError',
+    'NullPointerException',
+    'SyntaxError',
+    'TypeMismatch',
+    'MissingDependency',
+    'ConfigurationError'
+])
+
+# 輸出格式 -> 副檔名
+OUTPUT_FORMATS = {'csv': '.csv', 'parquet': '.parquet'}
+
+def _rng(rng):
+    """未指定時使用未設定種子的Generator"""
+    return rng if rng is not None else np.random.default_rng()
+
+def _write(df, data_dir, project_name, name, fmt, date_format='%Y-%m-%d'):
+    """寫出資料檔
+
+    CSV以pyarrow寫出；日期欄位只格式化不重複的日期後再展開，
+    避免逐列呼叫strftime。Parquet保留原始日期型別。
+    """
+    os.makedirs(f'{data_dir}/{project_name}', exist_ok=True)
+    path = f'{data_dir}/{project_name}/{name}{OUTPUT_FORMATS[fmt]}'
+    if fmt == 'parquet':
+        df.to_parquet(path, index=False)
+        return
+    columns = {}
+    for column in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df[column]):
+            codes, uniques = pd.factorize(df[column])
+            columns[column] = pa.array(np.asarray(uniques.strftime(date_format), dtype=object)[codes])
+        else:
+            columns[column] = pa.array(df[column].to_numpy(), from_pandas=True)
+    # 標題列自行寫出 (pyarrow會為標題加上引號)，資料列不加引號
+    with open(path, 'wb') as f:
+        f.write((','.join(df.columns) + '\n').encode('utf-8'))
+        pa_csv.write_csv(
+            pa.table(columns), f,
+            pa_csv.WriteOptions(include_header=False, quoting_style='none')
+        )
+
+def generate_module_coverage_data(project_name, start_date=None, end_date=None, modules=6, data_dir='data',
+                                  rng=None, fmt='csv'):
+    """生成模組覆蓋率數據
+
+    Args:
+        project_name (str): 專案名稱
+        start_date, end_date (datetime, optional): 日期範圍，預設 2024/02/01 ~ 2025/12/01
+        modules (int): 每天的模組數量
+        data_dir (str): 輸出的資料根目錄
+        rng (numpy.random.Generator, optional): 亂數產生器
+        fmt (str): 'csv' 或 'parquet'
+    """
+    rng = _rng(rng)
+    start_date = start_date or datetime(2024, 2, 1)
+    end_date = end_date or datetime(2025, 12, 1)
     date_range = pd.date_range(start_date, end_date)
-    
-    # 為每個日期生成6個module的資料
-    data = []
-    for date in date_range:
-        for module_num in range(1, 7):
-            total_lines = np.random.randint(101, 1000)  # Minimum 101 to ensure covered_lines can be <= total_lines
-            covered_lines = np.random.randint(100, total_lines + 1)  # +1 to include total_lines
-            coverage = round((covered_lines / total_lines) * 100, 2)
-            
-            data.append({
-                'date': date.strftime('%Y/%m/%d'),
-                'module_name': f'm{module_num}',
-                'covered_line_number': covered_lines,
-                'total_line_number': total_lines,
-                'coverage_percentage': coverage
-            })
-    
-    df = pd.DataFrame(data)
-    os.makedirs(f'data/{project_name}', exist_ok=True)
-    df.to_csv(f'data/{project_name}/module_coverage.csv', index=False)
+    n = len(date_range) * modules
+
+    # 每個日期生成各module的資料 (日期為外層、模組為內層)
+    total_lines = rng.integers(101, 1000, n)  # 至少101行，確保covered_lines <= total_lines
+    covered_lines = rng.integers(100, total_lines + 1)
+
+    df = pd.DataFrame({
+        'date': np.repeat(date_range.values, modules),
+        'module_name': np.tile(np.char.add('m', np.arange(1, modules + 1).astype(str)), len(date_range)),
+        'covered_line_number': covered_lines,
+        'total_line_number': total_lines,
+        'coverage_percentage': (covered_lines / total_lines * 100).round(2)
+    })
+    _write(df, data_dir, project_name, 'module_coverage', fmt, '%Y/%m/%d')
     return df
 
-def generate_preflight_data(project_name):
-    """生成preflight測試結果數據"""
-    if project_name in ['project1', 'project3', 'project5']:
+def generate_preflight_data(project_name, start_date=None, end_date=None, max_per_day=10, data_dir='data',
+                            enabled=None, rng=None, fmt='csv'):
+    """生成preflight測試結果數據
+
+    工作日每天1~max_per_day筆結果: 10% build fail、20% wut fail、70% pass；
+    wut fail的結果附帶隨機的失敗案例。
+
+    Args:
+        project_name (str): 專案名稱
+        start_date, end_date (datetime, optional): 日期範圍，預設 2024/02/01 ~ 2024/12/01
+        max_per_day (int): 每個工作日最多的測試結果筆數
+        data_dir (str): 輸出的資料根目錄
+        enabled (bool, optional): 是否生成；None表示依NO_PREFLIGHT_PROJECTS決定
+        rng (numpy.random.Generator, optional): 亂數產生器
+        fmt (str): 'csv' 或 'parquet'
+    """
+    if enabled is None:
+        enabled = project_name not in NO_PREFLIGHT_PROJECTS
+    if not enabled:
         return None
-        
-    start_date = datetime(2024, 2, 1)
-    end_date = datetime(2024, 12, 1)
+
+    rng = _rng(rng)
+    start_date = start_date or datetime(2024, 2, 1)
+    end_date = end_date or datetime(2024, 12, 1)
     date_range = pd.date_range(start_date, end_date)
-    
-    # 生成測試結果數據
-    data = []
-    for date in date_range:
-        # 跳過週末(周六=5, 周日=6)
-        if date.weekday() >= 5:
-            continue
-            
-        # 每天1-10筆測試結果
-        num_records = np.random.randint(1, 11)
-        for _ in range(num_records):
-            # 隨機生成測試結果
-            rand = np.random.rand()
-            if rand < 0.1:  # 10% build fail
-                test_type = 'build_fail'
-            elif rand < 0.3:  # 20% wut fail
-                test_type = 'wut_fail'
-            else:  # 70% pass
-                test_type = 'pass'
-                
-            # 失败案例列表
-            fail_cases = [
-                'TimeoutError', 
-                'AssertionError',
-                'NetworkError',
-                'ValidationError',
-                'NullPointerException',
-                'SyntaxError',
-                'TypeMismatch',
-                'MissingDependency',
-                'ConfigurationError'
-            ]
-            
-            record = {
-                'date': date.strftime('%Y/%m/%d'),
-                'type': test_type
-            }
-            
-            if test_type == 'wut fail':
-                record['wut_fail_case'] = np.random.choice(fail_cases)
-                
-            data.append(record)
-    
-    df = pd.DataFrame(data)
-    os.makedirs(f'data/{project_name}', exist_ok=True)
-    df.to_csv(f'data/{project_name}/preflight_wut_result.csv', index=False)
+    # 跳過週末(周六=5, 周日=6)
+    workdays = date_range[date_range.weekday < 5]
+
+    num_records = rng.integers(1, max_per_day + 1, len(workdays))
+    dates = np.repeat(workdays.values, num_records)
+    rand = rng.random(len(dates))
+    test_type = np.select(
+        [rand < 0.1, rand < 0.3],
+        ['build_fail', 'wut_fail'],
+        default='pass'
+    )
+    wut_fail_case = np.where(
+        test_type == 'wut_fail',
+        FAIL_CASES[rng.integers(0, len(FAIL_CASES), len(dates))],
+        None
+    )
+
+    df = pd.DataFrame({'date': dates, 'type': test_type, 'wut_fail_case': wut_fail_case})
+    _write(df, data_dir, project_name, 'preflight_wut_result', fmt, '%Y/%m/%d')
     return df
 
-def generate_project_data(project_name, base_value):
-    start_date = datetime(2024, 1, 1)
-    end_date = datetime(2024, 12, 31)
-    date_range = pd.date_range(start_date, end_date)
-    
-    # 隨機跳過5-115天，確保至少有250天資料
-    skip_days = np.random.randint(5, 115)
-    dates = []
-    current_date = start_date
-    while current_date <= end_date:
-        dates.append(current_date)
-        current_date += timedelta(days=1 + np.random.randint(0, 3))  # 隨機間隔1-3天
-        
-    # 確保至少有250天資料
-    if len(dates) < 250:
-        dates = dates[:250]
-    
+def generate_project_data(project_name, base_value, start_date=None, end_date=None, modules=6,
+                          preflight_per_day=10, data_dir='data', preflight=None, rng=None, fmt='csv'):
+    """生成單一專案的全部數據 (品質指標、模組覆蓋率、preflight結果)
+
+    Args:
+        project_name (str): 專案名稱
+        base_value (int): 測試執行數與覆蓋率的基準值
+        start_date, end_date (datetime, optional): 日期範圍；未指定時各資料使用原本的預設範圍
+        modules (int): 模組數量
+        preflight_per_day (int): 每個工作日最多的preflight結果筆數
+        data_dir (str): 輸出的資料根目錄
+        preflight (bool, optional): 是否生成preflight資料；None表示依NO_PREFLIGHT_PROJECTS決定
+        rng (numpy.random.Generator, optional): 亂數產生器
+        fmt (str): 'csv' 或 'parquet'
+    """
+    rng = _rng(rng)
+    qa_start = pd.Timestamp(start_date or datetime(2024, 1, 1))
+    qa_end = pd.Timestamp(end_date or datetime(2024, 12, 31))
+
+    # 隨機間隔1-3天取樣日期 (間隔數以最壞情況每天一筆估計，再截斷到結束日期)
+    span_days = (qa_end - qa_start).days
+    offsets = np.concatenate([[0], np.cumsum(1 + rng.integers(0, 3, span_days))])
+    offsets = offsets[offsets <= span_days]
+    dates = qa_start + pd.to_timedelta(offsets, unit='D')
+    n = len(dates)
+
     # 生成測試數據
-    test_executed = np.random.randint(base_value, base_value + 100, len(dates))
-    test_passed = test_executed - np.random.randint(5, 30, len(dates))
+    test_executed = rng.integers(base_value, base_value + 100, n)
+    test_passed = test_executed - rng.integers(5, 30, n)
     test_failed = test_executed - test_passed
     pass_rate = (test_passed / test_executed * 100).round(2)
-    open_bugs = np.random.randint(5, 30, len(dates))
-    critical_bugs = np.random.randint(0, 10, len(dates))
+    open_bugs = rng.integers(5, 30, n)
+    critical_bugs = rng.integers(0, 10, n)
     code_coverage = np.linspace(
-        base_value/2, 
-        base_value/2 + 30, 
-        len(dates)
+        base_value/2,
+        base_value/2 + 30,
+        n
     ).round(1)
-    
+
     # 建立DataFrame
     df = pd.DataFrame({
         'Date': dates,
@@ -126,20 +194,17 @@ def generate_project_data(project_name, base_value):
         'Critical_Bugs': critical_bugs,
         'Code_Coverage': code_coverage
     })
-    
-    # 儲存CSV
-    os.makedirs(f'data/{project_name}', exist_ok=True)
-    df.to_csv(f'data/{project_name}/sample_qa_dashboard.csv', index=False)
-    
+    _write(df, data_dir, project_name, 'sample_qa_dashboard', fmt)
+
     # 生成module coverage資料
-    generate_module_coverage_data(project_name)
-    
+    generate_module_coverage_data(project_name, start_date, end_date, modules, data_dir, rng, fmt)
+
     # 生成preflight測試結果
-    generate_preflight_data(project_name)
-    
+    generate_preflight_data(project_name, start_date, end_date, preflight_per_day, data_dir, preflight, rng, fmt)
+
     return df
 
-# 生成10個專案資料
+# 預設的10個專案及其基準值
 projects = {
     'project1': 80,
     'project2': 70,
@@ -153,5 +218,49 @@ projects = {
     'project10': 55
 }
 
-for name, base in projects.items():
-    generate_project_data(name, base)
+def generate_dataset(n_projects=len(projects), start_date=None, end_date=None, modules=6, preflight_per_day=10,
+                     data_dir='data', preflight=None, seed=None, fmt='csv'):
+    """生成N個專案的數據
+
+    專案命名為 project1 ~ projectN；預設專案使用projects中的基準值，
+    其餘在40~100之間循環。同一個seed會生成完全相同的資料。
+
+    Returns:
+        list: 專案名稱清單
+    """
+    rng = np.random.default_rng(seed)
+    names = [f'project{i}' for i in range(1, n_projects + 1)]
+    for i, name in enumerate(names):
+        base_value = projects.get(name, 40 + (i * 5) % 65)
+        generate_project_data(
+            name, base_value, start_date, end_date, modules,
+            preflight_per_day, data_dir, preflight, rng, fmt
+        )
+    return names
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='生成儀表板合成資料')
+    parser.add_argument('--projects', type=int, default=len(projects), help='專案數量')
+    parser.add_argument('--start', type=lambda s: datetime.strptime(s, '%Y-%m-%d'),
+                        help='開始日期 (YYYY-MM-DD)，未指定時使用各資料的預設範圍')
+    parser.add_argument('--days', type=int, help='天數 (需同時指定--start)')
+    parser.add_argument('--modules', type=int, default=6, help='每個專案的模組數量')
+    parser.add_argument('--preflight-per-day', type=int, default=10, help='每個工作日最多的preflight結果筆數')
+    parser.add_argument('--all-preflight', action='store_true', help='所有專案都生成preflight資料')
+    parser.add_argument('--seed', type=int, help='亂數種子')
+    parser.add_argument('--data-dir', default='data', help='輸出的資料根目錄')
+    parser.add_argument('--format', choices=list(OUTPUT_FORMATS), default='csv', help='輸出格式')
+    args = parser.parse_args(argv)
+
+    if args.days is not None and args.start is None:
+        parser.error('--days 需要同時指定 --start')
+    end_date = args.start + timedelta(days=args.days - 1) if args.days is not None else None
+
+    names = generate_dataset(
+        args.projects, args.start, end_date, args.modules, args.preflight_per_day,
+        args.data_dir, True if args.all_preflight else None, args.seed, args.format
+    )
+    print(f"已生成 {len(names)} 個專案的資料: {args.data_dir}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,548 @@
+"""列式資料儲存層
+
+將 data/project*/ 下的三種CSV (sample_qa_dashboard / module_coverage /
+preflight_wut_result) 轉存為依「專案 + 月份」分區的Parquet檔，
+讓儀表板在快取失效時不必重新解析全部CSV。
+
+目錄結構:
+    data/.store/manifest.json                      # 來源檔案簽章 (mtime/size/sha1)，含最近一次匯入失敗的簽章
+    data/.store/.lock                              # 跨行程寫入鎖 (儀表板與API各自同步時互斥)
+    data/.store/{kind}/{project}/{YYYY-MM}.parquet # 分區資料
+
+使用範例:
+    >>> sync_store()
+    >>> df = read_dataset('qa', columns=['Date', 'Pass_Rate(%)'])
+"""
+import copy
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows: 沒有fcntl，只以行程內的鎖保護
+    fcntl = None
+
+import numpy as np
+import pandas as pd
+
+from utils.schemas import SCHEMAS, read_dtypes
+
+DATA_DIR = Path('data')
+STORE_DIR = DATA_DIR / '.store'
+MANIFEST_PATH = STORE_DIR / 'manifest.json'
+LOCK_PATH = STORE_DIR / '.lock'
+
+# 資料種類 -> 來源檔名、日期欄位/格式與精簡欄位型別 (定義於utils/schemas.py)
+KINDS = SCHEMAS
+
+# 匯入邏輯或分區格式改變時遞增，既有分區會在下次同步時重新匯入
+STORE_VERSION = 3
+
+# 平行匯入的worker數與執行器 ('thread' 或 'process')，可用環境變數調整
+INGEST_WORKERS = int(os.environ.get('QA_DASHBOARD_INGEST_WORKERS', min(8, os.cpu_count() or 1)))
+INGEST_EXECUTOR = os.environ.get('QA_DASHBOARD_INGEST_EXECUTOR', 'thread')
+
+_lock = threading.RLock()
+# 讀取端共用的manifest快照: (檔案stat鍵, manifest, {衍生結果的鍵: 值})
+_snapshot = (None, {}, {})
+# 最近一次有待同步來源檔的sync_store的逐檔匯入結果
+_last_report = []
+
+
+def _file_sha1(path):
+    """計算檔案內容的sha1"""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _load_manifest():
+    if not MANIFEST_PATH.exists():
+        return {}
+    try:
+        with open(MANIFEST_PATH, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        logging.warning(f"store manifest 損毀，將重新建立: {MANIFEST_PATH}")
+        return {}
+
+
+def _manifest_snapshot():
+    """返回讀取端共用、不可修改的manifest與其衍生結果快取
+
+    manifest檔的 (mtime_ns, 大小, inode) 未變時直接使用上次解析的結果，
+    查詢只需一次stat，不重新讀取與解析JSON；寫入端 (sync_store) 以os.replace
+    換檔，換檔後的第一次查詢重新載入。
+
+    Returns:
+        tuple: (manifest dict, 衍生結果dict (以此快照為範圍的快取))
+    """
+    global _snapshot
+    try:
+        stat = MANIFEST_PATH.stat()
+        key = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+    except FileNotFoundError:
+        key = None
+    snapshot = _snapshot
+    if snapshot[0] != key or key is None:
+        snapshot = _snapshot = (key, _load_manifest(), {})
+    return snapshot[1], snapshot[2]
+
+
+@contextmanager
+def store_lock():
+    """儲存寫入鎖: 同一行程內以執行緒鎖互斥，不同行程 (儀表板、API) 之間以
+    data/.store/.lock 的檔案鎖 (flock) 互斥；沒有fcntl的平台只有行程內互斥
+    """
+    with _lock:
+        if fcntl is None:
+            yield
+            return
+        STORE_DIR.mkdir(parents=True, exist_ok=True)
+        with open(LOCK_PATH, 'a') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def atomic_write(path, write):
+    """先寫入同目錄下名稱唯一的暫存檔再取代目標檔
+
+    暫存檔以tempfile.mkstemp建立，多個寫入者同時寫同一個目標也不會互相覆蓋
+    或搬走對方的暫存檔；讀取端只會看到完整的舊檔或新檔。
+
+    Args:
+        path (Path): 目標檔
+        write (callable): 接收暫存檔路徑 (str) 並寫入內容的函數
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.', suffix='.tmp')
+    os.close(fd)
+    try:
+        # mkstemp建立的檔案權限為0600，改為一般檔案的權限讓其他帳號的讀取端 (如API) 可讀
+        os.chmod(tmp_path, 0o644)
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def _save_manifest(manifest):
+    def write(tmp_path):
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+    atomic_write(MANIFEST_PATH, write)
+
+
+def _partition_dir(kind, project):
+    return STORE_DIR / kind / project
+
+
+def _source_files():
+    """列出data目錄下所有可匯入的來源檔案
+
+    Returns:
+        list[tuple]: (kind, project, Path) 清單
+    """
+    sources = []
+    for project_dir in sorted(DATA_DIR.glob('project*')):
+        if not project_dir.is_dir():
+            continue
+        for kind, spec in KINDS.items():
+            path = project_dir / spec['file']
+            if path.exists():
+                sources.append((kind, project_dir.name, path))
+    return sources
+
+
+def _apply_dtypes(df, dtypes):
+    """套用精簡欄位型別；含缺值的整數欄位改用float32"""
+    for column, dtype in dtypes.items():
+        if column not in df.columns:
+            continue
+        if dtype.startswith('int') and df[column].isna().any():
+            dtype = 'float32'
+        df[column] = df[column].astype(dtype)
+    return df
+
+
+def _parse_dates(values, date_format, path):
+    """以宣告的固定格式解析日期；不符合時退回格式推斷並記錄警告"""
+    try:
+        return pd.to_datetime(values, format=date_format)
+    except (ValueError, TypeError):
+        logging.warning(f"{path} 的日期不符合格式 {date_format}，改用格式推斷")
+        return pd.to_datetime(values)
+
+
+def _read_source(kind, path):
+    """讀取單一來源CSV，以固定格式轉換日期欄位並套用精簡型別"""
+    schema = KINDS[kind]
+    date_column = schema['date_column']
+    df = pd.read_csv(path, dtype=read_dtypes(kind))
+    df[date_column] = _parse_dates(df[date_column], schema['date_format'], path)
+    if kind == 'preflight_wut':
+        # 資料檔使用 build_fail / wut_fail，統一為儀表板使用的 build fail / wut fail
+        df['type'] = df['type'].astype(str).str.strip().str.lower().str.replace('_', ' ', regex=False)
+    return _apply_dtypes(df, schema['dtypes'])
+
+
+def _write_partitions(kind, project, df):
+    """將DataFrame依月份寫成分區檔，並移除舊分區
+
+    Returns:
+        list[str]: 寫入的月份分區 (YYYY-MM)
+    """
+    date_column = KINDS[kind]['date_column']
+    target_dir = _partition_dir(kind, project)
+    target_dir.mkdir(parents=True, exist_ok=True)
+
+    # 以datetime64[M]取月份，只將不重複的月份格式化為分區名稱 (YYYY-MM)
+    month_codes, month_values = pd.factorize(df[date_column].to_numpy().astype('datetime64[M]'), sort=True)
+    month_names = np.datetime_as_string(month_values, unit='M')
+    written = []
+    for code, part in df.groupby(month_codes, sort=True):
+        month = str(month_names[code])
+        part = part.sort_values(date_column)
+        atomic_write(target_dir / f'{month}.parquet', lambda tmp_path: part.to_parquet(tmp_path, index=False))
+        written.append(month)
+
+    # 清除來源中已不存在的月份
+    for stale in target_dir.glob('*.parquet'):
+        if stale.stem not in written:
+            stale.unlink()
+    return written
+
+
+def _ingest(kind, project, path, signature):
+    """匯入單一來源檔並回傳manifest紀錄"""
+    df = _read_source(kind, path)
+    months = _write_partitions(kind, project, df)
+    date_column = KINDS[kind]['date_column']
+    entry = dict(signature)
+    entry.update({
+        'store_version': STORE_VERSION,
+        'kind': kind,
+        'project': project,
+        'rows': int(len(df)),
+        'months': months,
+        'min_date': df[date_column].min().strftime('%Y-%m-%d') if len(df) else None,
+        'max_date': df[date_column].max().strftime('%Y-%m-%d') if len(df) else None,
+    })
+    return entry
+
+
+def _sync_source(kind, project, path, signature, previous_sha1):
+    """在worker中處理單一來源檔: 計算雜湊，內容改變時才重新匯入
+
+    例外不會往外拋出，改以結果回報，單一檔案失敗不影響其他檔案。
+
+    Returns:
+        dict: {'entry', 'ingested', 'seconds', 'error'}
+    """
+    start = time.perf_counter()
+    try:
+        signature = dict(signature, sha1=_file_sha1(path))
+        if signature['sha1'] == previous_sha1:
+            # 只有mtime改變，內容相同
+            return {'entry': signature, 'ingested': False, 'seconds': time.perf_counter() - start, 'error': None}
+        entry = _ingest(kind, project, path, signature)
+        return {'entry': entry, 'ingested': True, 'seconds': time.perf_counter() - start, 'error': None}
+    except Exception as e:
+        return {
+            'entry': None, 'ingested': False, 'seconds': time.perf_counter() - start,
+            'error': f"{type(e).__name__}: {e}",
+        }
+
+
+def _run_pending(pending, workers, executor):
+    """依序或以worker pool處理待同步的來源檔，結果順序與pending相同"""
+    if workers <= 1 or len(pending) <= 1:
+        return [_sync_source(*task) for task in pending]
+    pool_class = ProcessPoolExecutor if executor == 'process' else ThreadPoolExecutor
+    with pool_class(max_workers=min(workers, len(pending))) as pool:
+        futures = [pool.submit(_sync_source, *task) for task in pending]
+        return [future.result() for future in futures]
+
+
+def sync_store(workers=None, executor=None):
+    """同步CSV來源與Parquet儲存
+
+    只會重新匯入mtime/大小改變且內容雜湊不同的檔案；
+    來源已刪除的分區會一併移除。待匯入的檔案 (雜湊、解析、寫分區)
+    分派到worker pool平行處理，各檔的耗時與錯誤可由last_ingest_report()取得；
+    匯入失敗的檔案保留原manifest紀錄 (與既有分區)，並在紀錄的failed欄位記下失敗時的
+    mtime/大小，之後的同步略過該檔，直到檔案再次變動 (或STORE_VERSION改變) 才重試。
+    整個同步在store_lock()中進行，manifest只在內容改變時寫回。
+
+    Args:
+        workers (int, optional): worker數，預設INGEST_WORKERS
+        executor (str, optional): 'thread' 或 'process'，預設INGEST_EXECUTOR
+
+    Returns:
+        list[str]: 本次重新匯入的來源檔路徑
+    """
+    global _last_report
+    workers = INGEST_WORKERS if workers is None else workers
+    executor = executor or INGEST_EXECUTOR
+
+    with store_lock():
+        manifest = _load_manifest()
+        original = copy.deepcopy(manifest)
+        seen = set()
+        changed = []
+        pending = []
+        keys = []
+
+        for kind, project, path in _source_files():
+            key = path.as_posix()
+            seen.add(key)
+            stat = path.stat()
+            entry = manifest.get(key)
+            failed = entry.get('failed') if entry is not None else None
+            if (failed and failed['store_version'] == STORE_VERSION
+                    and failed['mtime_ns'] == stat.st_mtime_ns and failed['size'] == stat.st_size):
+                # 上次匯入失敗後檔案未再變動，不重新雜湊/解析
+                continue
+            current = entry is not None and entry.get('store_version') == STORE_VERSION
+            if current and entry['mtime_ns'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+                continue
+
+            signature = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+            previous_sha1 = entry.get('sha1') if current and _partition_dir(kind, project).exists() else None
+            pending.append((kind, project, path, signature, previous_sha1))
+            keys.append(key)
+
+        report = []
+        start = time.perf_counter()
+        for key, task, result in zip(keys, pending, _run_pending(pending, workers, executor)):
+            kind, project = task[0], task[1]
+            report.append({
+                'source': key, 'kind': kind, 'project': project,
+                'seconds': round(result['seconds'], 4),
+                'rows': result['entry'].get('rows') if result['ingested'] else None,
+                'ingested': result['ingested'], 'error': result['error'],
+            })
+            if result['error']:
+                signature = task[3]
+                manifest.setdefault(key, {'kind': kind, 'project': project})['failed'] = {
+                    'mtime_ns': signature['mtime_ns'], 'size': signature['size'],
+                    'store_version': STORE_VERSION, 'error': result['error'],
+                }
+                logging.error(f"匯入失敗 {key}: {result['error']} (檔案變動前不再重試)")
+            elif result['ingested']:
+                manifest[key] = result['entry']
+                changed.append(key)
+                logging.info(
+                    f"已匯入 {key} -> {kind}/{project} "
+                    f"({result['entry']['rows']} 行, {len(result['entry']['months'])} 個分區, {result['seconds']:.2f}s)"
+                )
+            else:
+                manifest[key].update(result['entry'])
+                manifest[key].pop('failed', None)
+        if pending:
+            failed = sum(1 for item in report if item['error'])
+            logging.info(
+                f"同步完成: {len(pending)} 個來源檔, {len(changed)} 個已匯入, {failed} 個失敗, "
+                f"耗時 {time.perf_counter() - start:.2f}s ({min(workers, len(pending))} workers, {executor})"
+            )
+            # 沒有待同步檔案的同步 (監看執行緒每次輪詢) 不覆蓋上一次的結果
+            _last_report = report
+
+        for key in list(manifest):
+            if key not in seen:
+                entry = manifest.pop(key)
+                for stale in _partition_dir(entry['kind'], entry['project']).glob('*.parquet'):
+                    stale.unlink()
+                changed.append(key)
+                logging.info(f"來源已移除，清除分區: {key}")
+
+        if manifest != original:
+            _save_manifest(manifest)
+        return changed
+
+
+def last_ingest_report():
+    """返回最近一次有待同步來源檔的sync_store中，每個來源檔的結果
+
+    Returns:
+        list[dict]: source, kind, project, seconds, rows, ingested, error
+    """
+    return [dict(item) for item in _last_report]
+
+
+def ingest_failures():
+    """返回目前匯入失敗、等待檔案變動後重試的來源檔 (由manifest的failed紀錄取得，跨行程可見)
+
+    Returns:
+        list[dict]: source, kind, project, error
+    """
+    manifest, _ = _manifest_snapshot()
+    return [
+        {'source': key, 'kind': entry['kind'], 'project': entry['project'], 'error': entry['failed']['error']}
+        for key, entry in sorted(manifest.items()) if 'failed' in entry
+    ]
+
+
+def _ingested_entries(kind):
+    """manifest中指定資料種類、曾成功匯入的紀錄 (只有失敗紀錄的來源檔沒有分區，不列入)"""
+    manifest, derived = _manifest_snapshot()
+    key = ('entries', kind)
+    if key not in derived:
+        derived[key] = [entry for entry in manifest.values() if entry['kind'] == kind and 'sha1' in entry]
+    return derived[key]
+
+
+def list_projects(kind='qa'):
+    """列出儲存中含有指定資料種類的專案"""
+    _, derived = _manifest_snapshot()
+    key = ('projects', kind)
+    if key not in derived:
+        derived[key] = sorted(
+            {entry['project'] for entry in _ingested_entries(kind)},
+            key=lambda name: (len(name), name)
+        )
+    return list(derived[key])
+
+
+def source_versions(kind):
+    """返回各專案來源檔的內容雜湊，供衍生資料 (rollup等) 判斷是否需要重建
+
+    manifest未變時使用快取結果，不讀取任何檔案 (只有一次stat)。
+
+    Returns:
+        dict: {project: "儲存版本:sha1"}
+    """
+    _, derived = _manifest_snapshot()
+    key = ('versions', kind)
+    if key not in derived:
+        derived[key] = {
+            entry['project']: f"{entry.get('store_version', 1)}:{entry['sha1']}"
+            for entry in _ingested_entries(kind)
+        }
+    return dict(derived[key])
+
+
+def date_bounds(kind='qa', projects=None):
+    """由manifest取得資料的最早與最晚日期，不需讀取任何分區
+
+    Returns:
+        tuple: (min_date, max_date) 的pandas.Timestamp，沒有資料時為 (None, None)
+    """
+    entries = [
+        entry for entry in _ingested_entries(kind)
+        if entry['min_date']
+        and (projects is None or entry['project'] in projects)
+    ]
+    if not entries:
+        return None, None
+    return (
+        pd.Timestamp(min(entry['min_date'] for entry in entries)),
+        pd.Timestamp(max(entry['max_date'] for entry in entries)),
+    )
+
+
+def _candidate_partitions(kind, projects, date_range):
+    """依專案與月份篩選分區檔 (分區剪枝)
+
+    Returns:
+        tuple: ([(project, Path), ...] 符合的分區, bool 是否有任何分區存在)
+    """
+    start_month = end_month = None
+    if date_range is not None:
+        start_month = pd.Timestamp(date_range[0]).strftime('%Y-%m')
+        end_month = pd.Timestamp(date_range[1]).strftime('%Y-%m')
+
+    selected = []
+    found_any = False
+    for project in projects:
+        for part_path in sorted(_partition_dir(kind, project).glob('*.parquet')):
+            found_any = True
+            if start_month and not (start_month <= part_path.stem <= end_month):
+                continue
+            selected.append((project, part_path))
+    return selected, found_any
+
+
+def empty_frame(kind, columns=None):
+    """回傳與儲存分區相同結構的空DataFrame (含Project欄位)"""
+    for part_path in STORE_DIR.joinpath(kind).glob('*/*.parquet'):
+        df = pd.read_parquet(part_path, columns=columns).iloc[0:0]
+        df['Project'] = pd.Series(dtype='category')
+        return df
+    return pd.DataFrame(columns=(columns or []) + ['Project'])
+
+
+def memory_footprint(df):
+    """回傳DataFrame的記憶體用量 (bytes，含object/category內容)"""
+    if df is None:
+        return 0
+    return int(df.memory_usage(deep=True).sum())
+
+
+def read_dataset(kind, projects=None, columns=None, date_range=None):
+    """從Parquet儲存讀取資料，專案與日期條件會下推到讀取階段
+
+    專案條件只開啟該專案的分區目錄；日期條件先以月份剪除分區，
+    再以Parquet row-group篩選只讀取範圍內的資料列。
+
+    Args:
+        kind (str): 資料種類，KINDS的鍵
+        projects (str or list, optional): 專案名稱或清單，None表示全部
+        columns (list, optional): 只讀取這些欄位，None表示全部
+        date_range (tuple, optional): (start_date, end_date)，兩端皆包含
+
+    Returns:
+        pandas.DataFrame or None: 含Project欄位的資料；
+            指定專案完全沒有分區時返回None，有分區但範圍內無資料時返回空DataFrame
+    """
+    if projects is None:
+        projects = list_projects(kind)
+    elif isinstance(projects, str):
+        projects = [projects]
+
+    filters = None
+    if date_range is not None:
+        date_column = KINDS[kind]['date_column']
+        filters = [
+            (date_column, '>=', pd.Timestamp(date_range[0])),
+            (date_column, '<=', pd.Timestamp(date_range[1])),
+        ]
+
+    partitions, found_any = _candidate_partitions(kind, projects, date_range)
+    if not found_any:
+        return None
+
+    frames = []
+    for project, part_path in partitions:
+        part = pd.read_parquet(part_path, columns=columns, filters=filters)
+        part['Project'] = project
+        frames.append(part)
+
+    if not frames:
+        return empty_frame(kind, columns)
+    df = pd.concat(frames, ignore_index=True)
+    for column, dtype in KINDS[kind]['dtypes'].items():
+        if dtype == 'category' and column in df.columns and df[column].dtype != 'category':
+            df[column] = df[column].astype('category')
+    # 專案類別依讀取順序排列，圖例順序與選擇順序一致
+    df['Project'] = pd.Categorical(
+        df['Project'], categories=list(dict.fromkeys(project for project, _ in partitions))
+    )
+    return df
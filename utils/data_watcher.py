@@ -0,0 +1,94 @@
+"""背景資料監看
+
+以輪詢方式定期檢查 data/project*/ 下的CSV，有變動時只重新匯入該專案、
+該資料種類的檔案並更新其資料版本。儀表板的快取鍵包含資料版本，
+因此只有受影響的專案/種類的快取項目會失效，其餘仍可直接命中。
+
+使用範例:
+    >>> watcher = DataWatcher(interval=5)
+    >>> watcher.start()
+    >>> watcher.version('qa', ['project1'])
+"""
+import hashlib
+import logging
+import threading
+
+from utils.data_store import KINDS, source_versions, sync_store
+from utils.rollups import sync_rollups
+
+# 預設輪詢間隔 (秒)
+POLL_INTERVAL = 5
+
+
+class DataWatcher(threading.Thread):
+    """定期同步資料儲存並維護各 (資料種類, 專案) 的版本"""
+
+    def __init__(self, interval=POLL_INTERVAL, on_change=None):
+        """
+        Args:
+            interval (float): 輪詢間隔 (秒)
+            on_change (callable, optional): 有變動時呼叫，參數為 [(kind, project), ...]
+        """
+        super().__init__(name='data-watcher', daemon=True)
+        self.interval = interval
+        self.on_change = on_change
+        self.generation = 0
+        self._versions = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self.poll()
+
+    def poll(self):
+        """同步一次並回傳版本有變動的 (kind, project) 清單"""
+        sync_store()
+        sync_rollups()
+        versions = {
+            (kind, project): version
+            for kind in KINDS
+            for project, version in source_versions(kind).items()
+        }
+        with self._lock:
+            changed = sorted(
+                key for key in set(versions) | set(self._versions)
+                if versions.get(key) != self._versions.get(key)
+            )
+            if changed:
+                self._versions = versions
+                self.generation += 1
+        return changed
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                changed = self.poll()
+            except Exception as e:
+                logging.error(f"資料監看同步失敗: {str(e)}", exc_info=True)
+                continue
+            if changed:
+                logging.info(f"偵測到資料變動，已重新匯入: {changed}")
+                if self.on_change:
+                    self.on_change(changed)
+
+    def stop(self):
+        """停止監看執行緒"""
+        self._stop_event.set()
+
+    def version(self, kind=None, projects=None):
+        """回傳資料版本字串，用於快取鍵
+
+        Args:
+            kind (str, optional): 資料種類，None表示所有資料 (使用整體世代編號)
+            projects (list, optional): 專案清單，None表示該種類的所有專案
+
+        Returns:
+            str: 內容改變時才會改變的版本字串
+        """
+        with self._lock:
+            if kind is None:
+                return str(self.generation)
+            parts = [
+                f"{project}={version}"
+                for (entry_kind, project), version in sorted(self._versions.items())
+                if entry_kind == kind and (projects is None or project in projects)
+            ]
+        return hashlib.sha1('|'.join(parts).encode('utf-8')).hexdigest()[:16]
@@ -0,0 +1,137 @@
+"""時間序列降採樣
+
+在篩選後的DataFrame與Plotly圖表之間，將每條曲線縮減到固定點數，
+同時保留峰值與低谷，避免長時間範圍的圖表傳送過多資料點到瀏覽器。
+
+提供兩種方法:
+    - minmax: 每個區段保留最小值與最大值 (完全向量化)
+    - lttb:   Largest-Triangle-Three-Buckets，視覺上最接近原曲線
+
+使用範例:
+    >>> small_df = downsample_frame(df, 'Date', 'Pass_Rate(%)', group='Project')
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+# 每條曲線的點數上限，可用環境變數 QA_DASHBOARD_MAX_POINTS 調整。
+# rollups.pick_resolution使用同一個上限挑選解析度，因此有彙總表時通常不需再降採樣；
+# 沒有彙總表 (退回每日原始資料) 或月彙總仍超過上限時，由downsample_frame保證點數上限。
+MAX_POINTS_PER_TRACE = int(os.environ.get('QA_DASHBOARD_MAX_POINTS', 120))
+
+
+def minmax_indices(y, max_points):
+    """以min/max分桶挑選資料點
+
+    Args:
+        y (numpy.ndarray): 依x排序後的數值
+        max_points (int): 保留點數上限 (含首尾點)
+
+    Returns:
+        numpy.ndarray: 保留的位置索引 (遞增)
+    """
+    n = len(y)
+    if n <= max_points or max_points < 4:
+        return np.arange(n)
+
+    n_buckets = (max_points - 2) // 2
+    # 首尾點固定保留，中間點平均分到各桶
+    bucket_ids = np.minimum(
+        (np.arange(n - 2) * n_buckets) // (n - 2), n_buckets - 1
+    )
+    inner = np.asarray(y[1:-1], dtype=float)
+    inner = np.where(np.isnan(inner), -np.inf, inner)
+    order = np.lexsort((inner, bucket_ids))
+    counts = np.bincount(bucket_ids, minlength=n_buckets)
+    ends = np.cumsum(counts)
+    starts = ends - counts
+    nonempty = counts > 0
+    picked = np.concatenate([order[starts[nonempty]], order[ends[nonempty] - 1]]) + 1
+    return np.unique(np.concatenate([[0], picked, [n - 1]]))
+
+
+def lttb_indices(x, y, max_points):
+    """以LTTB演算法挑選資料點
+
+    每個桶選出與「前一個已選點」及「下一桶平均點」構成最大三角形面積的點。
+    桶內面積計算以NumPy向量化，只在桶之間迴圈 (次數等於點數上限)。
+
+    Args:
+        x (numpy.ndarray): 依遞增排序的x值 (數值型)
+        y (numpy.ndarray): 對應的y值
+        max_points (int): 保留點數上限 (含首尾點)
+
+    Returns:
+        numpy.ndarray: 保留的位置索引 (遞增)
+    """
+    n = len(y)
+    if n <= max_points or max_points < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.nan_to_num(np.asarray(y, dtype=float))
+    edges = np.linspace(1, n - 1, max_points - 1).astype(int)
+
+    selected = np.empty(max_points, dtype=int)
+    selected[0] = 0
+    selected[-1] = n - 1
+    prev = 0
+    for i in range(max_points - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start, next_end = edges[i + 1], edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        areas = np.abs(
+            (x[prev] - avg_x) * (y[start:end] - y[prev])
+            - (x[prev] - x[start:end]) * (avg_y - y[prev])
+        )
+        prev = start + int(np.argmax(areas))
+        selected[i + 1] = prev
+    return selected
+
+
+def downsample_frame(df, x, y, group=None, max_points=MAX_POINTS_PER_TRACE, method='minmax'):
+    """依曲線分組降採樣DataFrame，回傳原資料列的子集合
+
+    Args:
+        df (pandas.DataFrame): 要繪圖的資料
+        x (str): x軸欄位 (日期)
+        y (str or list): y軸欄位；多個欄位時點數上限平均分配，保留各欄位挑選點的聯集
+        group (str, optional): 曲線分組欄位 (例如 'Project'、'module_name')
+        max_points (int): 每條曲線的點數上限
+        method (str): 'minmax' 或 'lttb'
+
+    Returns:
+        pandas.DataFrame: 降採樣後的資料，點數未超過上限時直接返回原資料
+    """
+    if df is None or len(df) == 0:
+        return df
+    y_columns = [y] if isinstance(y, str) else list(y)
+    df = df.reset_index(drop=True)
+
+    if group is None:
+        groups = [(None, df)]
+    else:
+        groups = df.groupby(group, sort=False, observed=True)
+        if groups.size().max() <= max_points:
+            return df
+
+    keep = []
+    for _, part in groups:
+        if len(part) <= max_points:
+            keep.append(part.index.to_numpy())
+            continue
+        part = part.sort_values(x)
+        budget = max(max_points // len(y_columns), 4)
+        positions = []
+        for column in y_columns:
+            values = part[column].to_numpy(dtype=float)
+            if method == 'lttb':
+                x_values = pd.to_datetime(part[x]).to_numpy(dtype='datetime64[ns]').astype('int64')
+                positions.append(lttb_indices(x_values, values, budget))
+            else:
+                positions.append(minmax_indices(values, budget))
+        keep.append(part.index.to_numpy()[np.unique(np.concatenate(positions))])
+
+    return df.loc[np.concatenate(keep)]
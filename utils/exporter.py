@@ -0,0 +1,167 @@
+"""資料匯出
+
+只在使用者要求時才產生匯出檔，並以「專案 -> 固定列數區塊」的方式逐段寫出，
+避免每次rerun都將整份篩選資料轉成CSV字串放在記憶體中。
+
+支援格式:
+    - csv:     UTF-8 CSV
+    - csv.gz:  gzip壓縮的CSV
+    - parquet: Parquet (欄位型別與儲存層一致)
+
+使用範例:
+    >>> with export_dataset('qa', ['project1'], (start, end), 'csv.gz') as f:
+    ...     data = f.read()
+"""
+import gzip
+import logging
+import tempfile
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from utils.data_store import KINDS, read_dataset
+
+# 可匯出的資料種類 -> (顯示名稱, 檔名前綴)
+EXPORT_DATASETS = {
+    'qa': ('專案數據', 'filtered_quality_data'),
+    'module_coverage': ('模組覆蓋率', 'module_coverage'),
+    'preflight_wut': ('Preflight WUT', 'preflight_wut_result'),
+}
+
+# 匯出格式 -> (顯示名稱, 副檔名, MIME類型)
+EXPORT_FORMATS = {
+    'csv': ('CSV', '.csv', 'text/csv'),
+    'csv.gz': ('CSV (gzip)', '.csv.gz', 'application/gzip'),
+    'parquet': ('Parquet', '.parquet', 'application/vnd.apache.parquet'),
+}
+
+# 每次轉換/寫出的資料列數
+CHUNK_ROWS = 50_000
+
+# 匯出檔小於此大小時留在記憶體，超過才寫到暫存檔
+SPOOL_MAX_SIZE = 8 * 1024 * 1024
+
+
+def export_filename(kind, fmt):
+    """回傳匯出檔名，例如 'module_coverage.csv.gz'"""
+    return EXPORT_DATASETS[kind][1] + EXPORT_FORMATS[fmt][1]
+
+
+def _export_columns(df):
+    """將Project移到第一欄，其餘依儲存層順序"""
+    return ['Project'] + [column for column in df.columns if column != 'Project']
+
+
+def iter_frames(kind, projects, date_range=None):
+    """依專案逐一讀取要匯出的資料，一次只保留一個專案的資料於記憶體
+
+    Yields:
+        pandas.DataFrame: 單一專案在日期範圍內的資料 (類別欄位轉為一般字串)
+    """
+    for project in projects:
+        df = read_dataset(kind, projects=[project], date_range=date_range)
+        if df is None or len(df) == 0:
+            continue
+        df = df.sort_values(KINDS[kind]['date_column'], kind='stable')
+        categorical = [column for column in df.columns if df[column].dtype == 'category']
+        df = df.astype({column: str for column in categorical})
+        yield df[_export_columns(df)].reset_index(drop=True)
+
+
+def iter_csv_chunks(frames, chunk_rows=CHUNK_ROWS):
+    """將多個DataFrame逐區塊轉為CSV bytes，只在第一個區塊輸出標題列
+
+    Yields:
+        bytes: UTF-8編碼的CSV片段
+    """
+    header = True
+    for df in frames:
+        for start in range(0, len(df), chunk_rows):
+            chunk = df.iloc[start:start + chunk_rows]
+            yield chunk.to_csv(index=False, header=header).encode('utf-8')
+            header = False
+
+
+def write_export(frames, fmt, fileobj, chunk_rows=CHUNK_ROWS):
+    """將資料以指定格式逐段寫入檔案物件
+
+    Args:
+        frames (iterable): DataFrame序列 (通常為iter_frames的結果)
+        fmt (str): EXPORT_FORMATS的鍵
+        fileobj: 可寫入的二進位檔案物件
+        chunk_rows (int): 每個區塊的資料列數
+
+    Returns:
+        int: 寫出的資料列數
+    """
+    rows = 0
+
+    def counted(frames):
+        nonlocal rows
+        for df in frames:
+            rows += len(df)
+            yield df
+
+    if fmt == 'csv':
+        for chunk in iter_csv_chunks(counted(frames), chunk_rows):
+            fileobj.write(chunk)
+    elif fmt == 'csv.gz':
+        with gzip.GzipFile(fileobj=fileobj, mode='wb', mtime=0) as gz:
+            for chunk in iter_csv_chunks(counted(frames), chunk_rows):
+                gz.write(chunk)
+    elif fmt == 'parquet':
+        writer = None
+        try:
+            for df in counted(frames):
+                table = pa.Table.from_pandas(df, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(fileobj, table.schema)
+                writer.write_table(table.cast(writer.schema), row_group_size=chunk_rows)
+        finally:
+            if writer is not None:
+                writer.close()
+    else:
+        raise ValueError(f"不支援的匯出格式: {fmt}")
+    return rows
+
+
+def export_dataset(kind, projects, date_range=None, fmt='csv'):
+    """產生匯出檔
+
+    資料依專案逐一讀取並逐段寫入暫存檔 (小檔留在記憶體)，
+    不會同時持有整份資料與整份序列化結果。
+
+    Args:
+        kind (str): 資料種類，EXPORT_DATASETS的鍵
+        projects (list): 專案清單
+        date_range (tuple, optional): (start_date, end_date)
+        fmt (str): EXPORT_FORMATS的鍵
+
+    Returns:
+        tempfile.SpooledTemporaryFile: 已移到開頭、可讀取的匯出檔；呼叫端負責關閉
+    """
+    if kind not in EXPORT_DATASETS:
+        raise ValueError(f"不支援的匯出資料: {kind}")
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"不支援的匯出格式: {fmt}")
+
+    fileobj = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    try:
+        rows = write_export(iter_frames(kind, projects, date_range), fmt, fileobj)
+    except Exception:
+        fileobj.close()
+        raise
+    size = fileobj.tell()
+    fileobj.seek(0)
+    logging.info(f"已產生匯出檔 {export_filename(kind, fmt)}: {rows} 行, {size / 1024:.1f} KB")
+    return fileobj
+
+
+def export_bytes(kind, projects, date_range=None, fmt='csv'):
+    """產生匯出檔並返回其內容
+
+    供st.download_button的data函數在按下時呼叫；Streamlit的媒體儲存無論收到
+    bytes或檔案物件都會轉為bytes保存，因此暫存檔在此讀取一次後即關閉。
+    """
+    with export_dataset(kind, projects, date_range, fmt) as fileobj:
+        return fileobj.read()
@@ -0,0 +1,107 @@
+"""圖表快取
+
+已建立的Plotly圖表的LRU快取，依圖表序列化後的JSON大小總和 (而非項目數) 淘汰。
+快取鍵由圖表名稱、篩選條件與資料版本計算，篩選條件與資料都沒變時
+(例如只展開了「詳情」) 直接使用已建立的Figure，不重新建立與驗證。
+快取的是Figure物件而非JSON字串: st.plotly_chart收到dict時會重新驗證整份圖表
+(空資料時還會拋出例外)，收到Figure則直接序列化。
+
+    - 整個行程共用 (各session看到相同篩選條件時共用同一份)
+    - 超過上限時淘汰最久未使用的項目；單一圖表超過上限時不快取
+    - 上限以 QA_DASHBOARD_FIGURE_CACHE_MB 設定 (預設64 MB)
+
+使用範例:
+    >>> cache = FigureCache(max_bytes=64 * 1024 * 1024)
+    >>> key = figure_key('trend', ('project1',), start_date, end_date, data_version)
+    >>> entry = cache.get(key)
+    >>> if entry is None:
+    ...     entry = cache.put(key, fig, len(fig.to_json()))
+    >>> fig, size = entry
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+# 快取上限 (bytes)
+FIGURE_CACHE_BYTES = int(float(os.environ.get('QA_DASHBOARD_FIGURE_CACHE_MB', 64)) * 1024 * 1024)
+
+
+def figure_key(name, *parts):
+    """由圖表名稱與篩選條件/資料版本計算快取鍵"""
+    return hashlib.sha1(repr((name,) + parts).encode('utf-8')).hexdigest()
+
+
+class FigureCache:
+    """依圖表JSON大小總和淘汰的Figure LRU快取"""
+
+    def __init__(self, max_bytes=FIGURE_CACHE_BYTES):
+        """
+        Args:
+            max_bytes (int): 快取內容的總大小上限 (bytes)
+        """
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (Figure, 序列化後的大小)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """取得 (Figure, 大小) 並標記為最近使用，不存在時返回None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, figure, size):
+        """存入圖表，超過上限時淘汰最久未使用的項目
+
+        Args:
+            key (str): figure_key的結果
+            figure (plotly.graph_objects.Figure): 圖表 (存入後不可再修改)
+            size (int): 圖表序列化後的JSON大小 (bytes)，用於淘汰
+
+        Returns:
+            tuple: (figure, size) (方便串接)
+        """
+        entry = (figure, size)
+        if size > self.max_bytes:
+            return entry
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = entry
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """返回快取統計
+
+        Returns:
+            dict: entries, bytes, max_bytes, hits, misses, evictions
+        """
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
@@ -0,0 +1,230 @@
+"""記憶體內索引
+
+ProjectDateIndex 為每個專案保存依日期排序的資料與日期陣列 (numpy datetime64)，
+相當於整份資料依 (專案, 日期) 排序並記錄每個專案的起點:
+
+    - 日期範圍篩選: 每個專案兩次 searchsorted 後以位置切片，
+      成本與資料總長度無關 (開啟copy-on-write時單一專案的切片不複製資料)
+    - 最新一列: 以結束日期二分搜尋「當時最新的一列」，
+      概覽卡片的查詢為 O(專案數 x log 行數)
+
+索引在查詢時延遲載入: 每次查詢只檢查所要求專案的來源檔版本
+(data_store.source_versions，manifest未變時不讀檔)，載入尚未載入或已變動的專案
+(多個專案時以與匯入相同數量的worker平行讀取)，其餘專案不會被讀取。
+已載入的資料依使用順序保留，總量超過 QA_DASHBOARD_INDEX_MB (預設256 MB) 時
+淘汰最久未使用的專案。
+
+使用範例:
+    >>> df = read_indexed('qa', ['project1'], date_range=(start, end))
+    >>> index = project_date_index('qa')
+    >>> df = index.slice(['project1', 'project2'], pd.Timestamp('2024-04-01'), pd.Timestamp('2024-06-30'))
+    >>> latest = index.latest(['project1', 'project2'], end=pd.Timestamp('2024-06-30'))
+"""
+import logging
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from utils.data_store import (
+    INGEST_WORKERS, KINDS, empty_frame, list_projects, memory_footprint, read_dataset, source_versions
+)
+
+# 每種資料已載入索引的記憶體上限 (bytes)，超過時淘汰最久未使用的專案
+INDEX_MAX_BYTES = int(float(os.environ.get('QA_DASHBOARD_INDEX_MB', 256)) * 1024 * 1024)
+
+_lock = threading.Lock()
+# 資料種類 -> 行程內共用的ProjectDateIndex
+_indexes = {}
+
+
+def _datetime64(value):
+    return np.datetime64(pd.Timestamp(value), 'ns')
+
+
+class ProjectDateIndex:
+    """每個專案依日期排序的資料，支援以日期二分搜尋篩選範圍與最新一列"""
+
+    def __init__(self, kind='qa', max_bytes=INDEX_MAX_BYTES):
+        """
+        Args:
+            kind (str): 資料種類，KINDS的鍵
+            max_bytes (int): 已載入資料的記憶體上限 (bytes)
+        """
+        self.kind = kind
+        self.date_column = KINDS[kind]['date_column']
+        self.max_bytes = max_bytes
+        # project -> (來源版本, 日期陣列, 依日期排序的DataFrame (不含Project欄位), bytes)，依使用順序排列
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def _load(self, project):
+        """讀取單一專案並依日期穩定排序 (同一天有多列時保持匯入順序)"""
+        df = read_dataset(self.kind, project)
+        if df is None:
+            df = empty_frame(self.kind)
+        df = df.drop(columns='Project')
+        dates = df[self.date_column].to_numpy(dtype='datetime64[ns]')
+        order = np.argsort(dates, kind='stable')
+        return dates[order], df.iloc[order].reset_index(drop=True)
+
+    def _entry(self, project, version):
+        dates, df = self._load(project)
+        return version, dates, df, memory_footprint(df) + dates.nbytes
+
+    def _load_many(self, projects, versions):
+        """載入多個專案的索引項目，超過一個時以執行緒池平行讀取 (Parquet讀取會釋放GIL)"""
+        workers = min(INGEST_WORKERS, len(projects))
+        if workers <= 1:
+            return [self._entry(project, versions[project]) for project in projects]
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(lambda project: self._entry(project, versions[project]), projects))
+
+    def _entries_for(self, projects):
+        """確保指定專案已載入且為最新版本，返回其索引項目
+
+        只檢查並載入傳入的專案 (未被要求的專案不會被讀取)；
+        總記憶體超過上限時淘汰最久未使用、且不在本次要求中的專案。
+
+        Returns:
+            list: [(project, (日期陣列, DataFrame)), ...]，依傳入順序，略過沒有資料的專案
+        """
+        versions = source_versions(self.kind)
+        projects = [project for project in dict.fromkeys(projects) if project in versions]
+        with self._lock:
+            changed = [
+                project for project in projects
+                if project not in self._entries or self._entries[project][0] != versions[project]
+            ]
+
+        # 在鎖外讀取，載入期間其他執行緒仍可查詢既有的索引
+        loaded = dict(zip(changed, self._load_many(changed, versions)))
+        if changed:
+            logging.debug("已載入%s索引: %s", self.kind, changed)
+
+        with self._lock:
+            # 檢查後才被其他執行緒淘汰的專案 (少見) 在鎖內補載入
+            for project in projects:
+                if project not in self._entries and project not in loaded:
+                    loaded[project] = self._entry(project, versions[project])
+            for project, entry in loaded.items():
+                previous = self._entries.pop(project, None)
+                if previous is not None:
+                    self._bytes -= previous[3]
+                self._entries[project] = entry
+                self._bytes += entry[3]
+            for project in projects:
+                self._entries.move_to_end(project)
+            requested = set(projects)
+            for project in list(self._entries):
+                if self._bytes <= self.max_bytes:
+                    break
+                if project in requested:
+                    continue
+                self._bytes -= self._entries.pop(project)[3]
+            return [(project, self._entries[project][1:3]) for project in projects]
+
+    def memory_usage(self):
+        """返回 (已載入的專案數, 記憶體用量bytes)"""
+        with self._lock:
+            return len(self._entries), self._bytes
+
+    def _combine(self, pieces):
+        """合併各專案的切片並加上Project類別欄位 (類別依傳入的專案順序)
+
+        Args:
+            pieces (list): [(project, DataFrame), ...]
+        """
+        projects = [project for project, _ in pieces]
+        if len(pieces) == 1:
+            df = pieces[0][1]
+        else:
+            df = pd.concat([piece for _, piece in pieces], ignore_index=True)
+            for column, dtype in KINDS[self.kind]['dtypes'].items():
+                if dtype == 'category' and column in df.columns and df[column].dtype != 'category':
+                    df[column] = df[column].astype('category')
+        codes = np.repeat(np.arange(len(pieces), dtype=np.int32), [len(piece) for _, piece in pieces])
+        return df.assign(Project=pd.Categorical.from_codes(codes, categories=projects))
+
+    def slice(self, projects, start=None, end=None, columns=None):
+        """篩選日期範圍內的資料 (兩端皆包含)
+
+        Args:
+            projects (str or list): 專案名稱或清單
+            start, end (optional): 日期範圍，None表示不限制
+            columns (list, optional): 只保留這些欄位，None表示全部
+
+        Returns:
+            pandas.DataFrame or None: 含Project欄位的資料，與data_store.read_dataset相同；
+                指定的專案都不在索引中時返回None
+        """
+        if isinstance(projects, str):
+            projects = [projects]
+        entries = self._entries_for(projects)
+        if not entries:
+            return None
+
+        start = None if start is None else _datetime64(start)
+        end = None if end is None else _datetime64(end)
+        pieces = []
+        for project, (dates, df) in entries:
+            lower = 0 if start is None else int(np.searchsorted(dates, start, side='left'))
+            upper = len(dates) if end is None else int(np.searchsorted(dates, end, side='right'))
+            if upper > lower:
+                pieces.append((project, (df if columns is None else df[columns]).iloc[lower:upper]))
+
+        if not pieces:
+            return empty_frame(self.kind, columns)
+        return self._combine(pieces)
+
+    def latest(self, projects, start=None, end=None):
+        """返回每個專案在日期範圍內最新的一列
+
+        Args:
+            projects (list): 專案清單
+            start (optional): 範圍開始日期，最新一列早於此日期的專案視為沒有資料
+            end (optional): 範圍結束日期 (as-of)，None表示全部資料中最新的一列
+
+        Returns:
+            pandas.DataFrame: 每個有資料的專案一列，依傳入的專案順序排列
+        """
+        start = None if start is None else _datetime64(start)
+        end = None if end is None else _datetime64(end)
+        pieces = []
+        for project, (dates, df) in self._entries_for(projects):
+            position = len(dates) if end is None else int(np.searchsorted(dates, end, side='right'))
+            position -= 1
+            if position < 0 or (start is not None and dates[position] < start):
+                continue
+            pieces.append((project, df.iloc[position:position + 1]))
+
+        if not pieces:
+            return empty_frame(self.kind)
+        return self._combine(pieces)
+
+
+def project_date_index(kind='qa'):
+    """返回行程內共用的ProjectDateIndex (第一次呼叫時建立，資料在查詢時載入)"""
+    with _lock:
+        if kind not in _indexes:
+            _indexes[kind] = ProjectDateIndex(kind)
+        return _indexes[kind]
+
+
+def read_indexed(kind, projects=None, columns=None, date_range=None):
+    """與data_store.read_dataset相同的介面，由索引切片取得資料 (只載入指定的專案)
+
+    Args:
+        kind (str): 資料種類
+        projects (str or list, optional): 專案名稱或清單，None表示全部
+        columns (list, optional): 只保留這些欄位
+        date_range (tuple, optional): (start_date, end_date)，兩端皆包含
+    """
+    if projects is None:
+        projects = list_projects(kind)
+    start, end = date_range if date_range is not None else (None, None)
+    return project_date_index(kind).slice(projects, start, end, columns)
@@ -0,0 +1,147 @@
+"""日誌系統
+
+Streamlit每次互動都會重新執行app.py，但utils模組只會匯入一次，
+因此日誌設定放在這裡並以模組狀態確保每個行程只初始化一次。
+
+    - 呼叫端只寫入QueueHandler (不做檔案I/O)，由背景QueueListener寫出
+    - 檔案: logs/app.log，每行一筆JSON (每天輪換，保留7天)
+    - 控制台: 文字格式，INFO以上
+    - 每筆記錄附帶rerun_id，可串起同一次rerun的所有日誌
+
+使用範例:
+    >>> setup_logging()
+    >>> new_rerun_id()
+    >>> logging.info("...")
+"""
+import atexit
+import contextvars
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import uuid
+from datetime import datetime, timezone
+
+LOG_DIR = 'logs'
+LOG_FILE = os.path.join(LOG_DIR, 'app.log')
+
+# 檔案日誌等級，可用環境變數 QA_DASHBOARD_LOG_LEVEL 調整 (例如 DEBUG)
+LOG_LEVEL = os.environ.get('QA_DASHBOARD_LOG_LEVEL', 'INFO').upper()
+
+_rerun_id = contextvars.ContextVar('rerun_id', default='-')
+_setup_lock = threading.Lock()
+_listener = None
+
+# LogRecord的內建屬性，其餘屬性 (logging的extra參數) 會一併輸出到JSON
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'rerun_id'}
+
+
+def new_rerun_id():
+    """為目前的rerun產生新的識別碼並返回"""
+    rerun_id = uuid.uuid4().hex[:8]
+    _rerun_id.set(rerun_id)
+    return rerun_id
+
+
+class RerunIdFilter(logging.Filter):
+    """在呼叫端執行緒為記錄加上rerun_id (需在進入佇列之前)"""
+
+    def filter(self, record):
+        record.rerun_id = _rerun_id.get()
+        return True
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """只在呼叫端合併訊息參數，例外堆疊保留在exc_text供各handler自行輸出"""
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """將記錄格式化為單行JSON"""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'src': f"{record.filename}:{record.lineno}",
+            'rerun_id': getattr(record, 'rerun_id', '-'),
+            'msg': record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exc'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def setup_logging(level=LOG_LEVEL):
+    """初始化日誌系統，重複呼叫不會重複加入handler
+
+    Args:
+        level (str or int): 根logger等級；低於此等級的記錄在呼叫端即被捨棄，
+            不會進行字串格式化
+    """
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            return
+
+        os.makedirs(LOG_DIR, exist_ok=True)
+
+        # 檔案handler (每天輪換)
+        file_handler = logging.handlers.TimedRotatingFileHandler(
+            LOG_FILE, when='midnight', backupCount=7, encoding='utf-8'
+        )
+        file_handler.setFormatter(JsonFormatter())
+
+        # 控制台handler
+        console_handler = logging.StreamHandler()
+        console_handler.setLevel(logging.INFO)
+        console_handler.setFormatter(logging.Formatter(
+            '%(asctime)s - %(levelname)s - [%(rerun_id)s] %(filename)s:%(lineno)d - %(message)s',
+            datefmt='%Y-%m-%d %H:%M:%S'
+        ))
+
+        log_queue = queue.SimpleQueue()
+        queue_handler = _QueueHandler(log_queue)
+        queue_handler.addFilter(RerunIdFilter())
+
+        logger = logging.getLogger()
+        logger.setLevel(level)
+        logger.addHandler(queue_handler)
+
+        _listener = logging.handlers.QueueListener(
+            log_queue, file_handler, console_handler, respect_handler_level=True
+        )
+        _listener.start()
+        atexit.register(shutdown_logging)
+
+    logging.info("日誌系統初始化完成")
+
+
+def shutdown_logging():
+    """停止背景寫出執行緒並寫出佇列中剩餘的記錄"""
+    global _listener
+    with _setup_lock:
+        if _listener is None:
+            return
+        _listener.stop()
+        _listener = None
+        for handler in list(logging.getLogger().handlers):
+            if isinstance(handler, _QueueHandler):
+                logging.getLogger().removeHandler(handler)
@@ -0,0 +1,231 @@
+"""效能量測
+
+以「span」量測每次rerun中各階段的耗時，並統計快取命中/未命中次數與
+各圖表傳送到瀏覽器的資料大小。結果有兩種用途:
+
+    - 本次rerun: 隱藏的效能面板 (網址加上 ?perf=1) 顯示各span耗時
+    - 行程累計: 以Prometheus文字格式輸出 (面板下載，或設定 QA_DASHBOARD_METRICS_FILE
+      每次rerun結束時寫入檔案)，並在每次rerun結束時寫一筆JSON日誌
+
+使用範例:
+    >>> start_rerun()
+    >>> with span('load_catalog'):
+    ...     ...
+    >>> @cache_calls('load_all_projects')
+    ... @st.cache_resource
+    ... @cache_misses
+    ... def load_all_projects(...): ...
+    >>> summary = finish_rerun()
+"""
+import contextvars
+import functools
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+METRIC_PREFIX = 'qa_dashboard'
+
+# 設定後每次rerun結束時將Prometheus指標寫入此檔 (供node_exporter textfile collector讀取)
+METRICS_FILE = os.environ.get('QA_DASHBOARD_METRICS_FILE')
+
+_lock = threading.Lock()
+# 行程累計: span名稱 -> [次數, 總秒數, 最大秒數]
+_span_totals = {}
+# 快取名稱 -> [命中次數, 未命中次數]
+_cache_totals = {}
+# 圖表名稱 -> 最近一次的資料大小 (bytes)
+_payload_sizes = {}
+
+# 本次rerun的記錄 (Streamlit每次rerun在同一個執行緒內執行)
+_current = contextvars.ContextVar('perf_rerun', default=None)
+# 目前這次快取呼叫是否執行了函數本體
+_miss_marker = contextvars.ContextVar('perf_cache_miss', default=None)
+
+
+class RerunStats:
+    """單次rerun的量測結果"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans = []       # [(名稱, 秒數, 深度)]
+        self.cache = {}       # 快取名稱 -> [命中, 未命中]
+        self.payloads = {}    # 圖表名稱 -> bytes
+        self.depth = 0
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+
+def start_rerun():
+    """開始記錄新的一次rerun"""
+    stats = RerunStats()
+    _current.set(stats)
+    return stats
+
+
+def current_rerun():
+    """返回目前rerun的量測結果 (尚未呼叫start_rerun時為None)"""
+    return _current.get()
+
+
+@contextmanager
+def span(name):
+    """量測一段程式的耗時，同時計入本次rerun與行程累計"""
+    stats = _current.get()
+    if stats is not None:
+        stats.depth += 1
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        if stats is not None:
+            stats.depth -= 1
+            stats.spans.append((name, seconds, stats.depth))
+        with _lock:
+            totals = _span_totals.setdefault(name, [0, 0.0, 0.0])
+            totals[0] += 1
+            totals[1] += seconds
+            totals[2] = max(totals[2], seconds)
+
+
+def timed(name):
+    """以span量測整個函數的裝飾器"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def cache_misses(func):
+    """放在st.cache_*的內層: 函數本體被執行即代表快取未命中"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        marker = _miss_marker.get()
+        if marker is not None:
+            marker.append(True)
+        return func(*args, **kwargs)
+    return wrapper
+
+
+def cache_calls(name):
+    """放在st.cache_*的外層: 量測呼叫耗時並依內層標記統計命中/未命中"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            marker = []
+            token = _miss_marker.set(marker)
+            try:
+                with span(name):
+                    return func(*args, **kwargs)
+            finally:
+                _miss_marker.reset(token)
+                record_cache(name, hit=not marker)
+        return wrapper
+    return decorator
+
+
+def record_cache(name, hit):
+    """記錄一次快取命中/未命中 (供st.cache_*以外的快取使用)"""
+    index = 0 if hit else 1
+    stats = _current.get()
+    if stats is not None:
+        stats.cache.setdefault(name, [0, 0])[index] += 1
+    with _lock:
+        _cache_totals.setdefault(name, [0, 0])[index] += 1
+
+
+def record_payload(name, size):
+    """記錄傳送到瀏覽器的資料大小 (bytes)"""
+    stats = _current.get()
+    if stats is not None:
+        stats.payloads[name] = size
+    with _lock:
+        _payload_sizes[name] = size
+
+
+def finish_rerun():
+    """結束本次rerun的記錄，寫一筆JSON日誌並返回摘要
+
+    Returns:
+        dict or None: {'total_ms', 'spans', 'cache', 'payloads'}
+    """
+    stats = _current.get()
+    if stats is None:
+        return None
+    summary = {
+        'total_ms': round(stats.elapsed() * 1000, 2),
+        'spans': {},
+        'cache': stats.cache,
+        'payloads': stats.payloads,
+    }
+    for name, seconds, _ in stats.spans:
+        summary['spans'][name] = round(summary['spans'].get(name, 0) + seconds * 1000, 2)
+    logging.info("rerun效能摘要", extra={'perf': summary})
+    if METRICS_FILE:
+        write_prometheus(METRICS_FILE)
+    return summary
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def prometheus_text():
+    """以Prometheus文字格式輸出行程累計的量測結果"""
+    with _lock:
+        spans = {name: list(values) for name, values in _span_totals.items()}
+        cache = {name: list(values) for name, values in _cache_totals.items()}
+        payloads = dict(_payload_sizes)
+
+    lines = [
+        f'# HELP {METRIC_PREFIX}_span_seconds Time spent in each instrumented stage.',
+        f'# TYPE {METRIC_PREFIX}_span_seconds summary',
+    ]
+    for name, (count, total, _) in sorted(spans.items()):
+        lines.append(f'{METRIC_PREFIX}_span_seconds_count{{span="{_escape(name)}"}} {count}')
+        lines.append(f'{METRIC_PREFIX}_span_seconds_sum{{span="{_escape(name)}"}} {total:.6f}')
+    lines += [
+        f'# HELP {METRIC_PREFIX}_span_max_seconds Slowest observed run of each stage.',
+        f'# TYPE {METRIC_PREFIX}_span_max_seconds gauge',
+    ]
+    for name, (_, _, longest) in sorted(spans.items()):
+        lines.append(f'{METRIC_PREFIX}_span_max_seconds{{span="{_escape(name)}"}} {longest:.6f}')
+    lines += [
+        f'# HELP {METRIC_PREFIX}_cache_requests_total Cached loader calls by result.',
+        f'# TYPE {METRIC_PREFIX}_cache_requests_total counter',
+    ]
+    for name, (hits, misses) in sorted(cache.items()):
+        lines.append(f'{METRIC_PREFIX}_cache_requests_total{{cache="{_escape(name)}",result="hit"}} {hits}')
+        lines.append(f'{METRIC_PREFIX}_cache_requests_total{{cache="{_escape(name)}",result="miss"}} {misses}')
+    lines += [
+        f'# HELP {METRIC_PREFIX}_payload_bytes Size of the last payload sent for each chart.',
+        f'# TYPE {METRIC_PREFIX}_payload_bytes gauge',
+    ]
+    for name, size in sorted(payloads.items()):
+        lines.append(f'{METRIC_PREFIX}_payload_bytes{{chart="{_escape(name)}"}} {size}')
+    return '\n'.join(lines) + '\n'
+
+
+def write_prometheus(path):
+    """將Prometheus指標寫入檔案 (先寫暫存檔再取代，讀取端不會讀到一半的內容)"""
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(prometheus_text())
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logging.warning(f"寫入效能指標失敗: {str(e)}")
+
+
+def reset():
+    """清除行程累計 (測試與基準量測用)"""
+    with _lock:
+        _span_totals.clear()
+        _cache_totals.clear()
+        _payload_sizes.clear()
@@ -0,0 +1,90 @@
+"""Preflight WUT 結果彙總
+
+以一次categorical-code bincount計算每個 (專案, 日期) 各測試類型的筆數，
+同一份結果同時供應概覽卡片 (期間總數) 與Preflight WUT堆疊長條圖使用。
+
+使用範例:
+    >>> counts = aggregate_preflight(pf_df)
+    >>> totals = preflight_totals(counts)
+"""
+import numpy as np
+import pandas as pd
+
+from utils.rollups import period_start
+
+# 顯示用的測試類型 (依堆疊順序)
+PREFLIGHT_TYPES = ('build fail', 'wut fail', 'pass')
+COUNT_COLUMNS = list(PREFLIGHT_TYPES) + ['total']
+
+
+def _empty_counts():
+    counts = pd.DataFrame(columns=['Project', 'date'] + COUNT_COLUMNS)
+    counts['date'] = pd.to_datetime(counts['date'])
+    return counts.astype({col: 'int64' for col in COUNT_COLUMNS})
+
+
+def aggregate_preflight(df):
+    """計算每個專案每天各類型的筆數
+
+    Args:
+        df (pandas.DataFrame): 含Project, date, type欄位的preflight原始資料
+
+    Returns:
+        pandas.DataFrame: 每個 (Project, date) 一列，欄位為
+            build fail / wut fail / pass 的筆數及total (含其他類型的總筆數)
+    """
+    if df is None or len(df) == 0:
+        return _empty_counts()
+
+    project_codes, project_labels = pd.factorize(df['Project'], sort=True)
+    date_codes, date_labels = pd.factorize(df['date'], sort=True)
+    type_codes = pd.Index(PREFLIGHT_TYPES).get_indexer(df['type'])
+    n_types = len(PREFLIGHT_TYPES)
+    type_codes = np.where(type_codes < 0, n_types, type_codes)  # 其他類型放在最後一欄
+
+    # (專案, 日期) 組合編碼後只保留實際出現的組合
+    group_keys = project_codes.astype(np.int64) * len(date_labels) + date_codes
+    unique_keys, group_codes = np.unique(group_keys, return_inverse=True)
+    flat = np.bincount(
+        group_codes.ravel() * (n_types + 1) + type_codes,
+        minlength=len(unique_keys) * (n_types + 1)
+    ).reshape(len(unique_keys), n_types + 1)
+
+    counts = pd.DataFrame(flat[:, :n_types], columns=list(PREFLIGHT_TYPES))
+    counts['total'] = flat.sum(axis=1)
+    counts.insert(0, 'Project', np.asarray(project_labels)[unique_keys // len(date_labels)])
+    counts.insert(1, 'date', np.asarray(date_labels)[unique_keys % len(date_labels)])
+    return counts
+
+
+def preflight_totals(counts):
+    """加總每個專案在期間內的各類型筆數
+
+    Returns:
+        pandas.DataFrame: 以Project為索引，欄位為 build fail / wut fail / pass / total
+    """
+    return counts.groupby('Project', observed=True)[COUNT_COLUMNS].sum()
+
+
+def format_combined(totals, project):
+    """格式化概覽卡片的 Build Fail / WUT Fail / Pass / Total 字串"""
+    if project not in totals.index:
+        return "0/0/0/0"
+    row = totals.loc[project]
+    return f"{row['build fail']}/{row['wut fail']}/{row['pass']}/{row['total']}"
+
+
+def counts_by_period(counts, resolution='daily'):
+    """將每日筆數彙總到指定解析度，供堆疊長條圖使用
+
+    Args:
+        counts (pandas.DataFrame): aggregate_preflight的結果
+        resolution (str): 'daily', 'weekly' 或 'monthly'
+
+    Returns:
+        pandas.DataFrame: 每個 (Project, date) 週期一列，依日期排序
+    """
+    if resolution != 'daily':
+        counts = counts.assign(date=period_start(counts['date'], resolution))
+        counts = counts.groupby(['Project', 'date'], as_index=False, observed=True)[COUNT_COLUMNS].sum()
+    return counts.sort_values('date').reset_index(drop=True)
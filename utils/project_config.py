@@ -1,15 +1,101 @@
 import json
+import logging
 import os
+import threading
 from pathlib import Path
+from types import MappingProxyType
+
+# 已解析的專案配置快取: project_name -> (mtime_ns, 唯讀配置)
+_config_cache = {}
+_cache_lock = threading.Lock()
+
+def _freeze(value):
+    """將dict/list遞迴轉為唯讀的MappingProxyType/tuple"""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+def _validate_config(project_name, config):
+    """以DEFAULT_CONFIG為基準檢查配置，缺少或格式錯誤的區段改用預設值"""
+    if not isinstance(config, dict):
+        logging.warning(f"專案配置格式錯誤，改用預設配置: {project_name}")
+        return json.loads(json.dumps(DEFAULT_CONFIG))
+
+    validated = dict(config)
+    for key, default in DEFAULT_CONFIG.items():
+        if key not in validated or not isinstance(validated[key], type(default)):
+            if key in config:
+                logging.warning(f"專案配置 {project_name} 的 {key} 格式錯誤，改用預設值")
+            validated[key] = json.loads(json.dumps(default))
+
+    metrics = {}
+    for metric, props in validated['metrics'].items():
+        if not isinstance(props, dict) or not isinstance(props.get('threshold', 100), (int, float)):
+            logging.warning(f"專案配置 {project_name} 的指標 {metric} 格式錯誤，已忽略")
+            continue
+        metrics[metric] = props
+    validated['metrics'] = metrics
+
+    validated['weights'] = {
+        metric: weight for metric, weight in validated['weights'].items()
+        if isinstance(weight, (int, float))
+    }
+    return validated
 
 def load_project_config(project_name):
-    """載入專案配置"""
+    """載入專案配置
+
+    配置在第一次載入後快取於行程內，只有config.json的mtime改變時才重新讀取。
+    返回的配置為唯讀物件 (MappingProxyType)，呼叫端不可修改。
+    """
     config_path = Path(f"data/{project_name}/config.json")
-    if not config_path.exists():
+    try:
+        mtime_ns = os.stat(config_path).st_mtime_ns
+    except FileNotFoundError:
+        with _cache_lock:
+            _config_cache.pop(project_name, None)
         return None
-    
-    with open(config_path) as f:
-        return json.load(f)
+
+    cached = _config_cache.get(project_name)
+    if cached and cached[0] == mtime_ns:
+        return cached[1]
+
+    with _cache_lock:
+        cached = _config_cache.get(project_name)
+        if cached and cached[0] == mtime_ns:
+            return cached[1]
+        with open(config_path, encoding='utf-8') as f:
+            config = _freeze(_validate_config(project_name, json.load(f)))
+        _config_cache[project_name] = (mtime_ns, config)
+        logging.debug("已載入專案配置: %s", config_path)
+        return config
+
+def config_version(project_names):
+    """回傳各專案config.json的mtime，配置變動時改變，可作為快取鍵
+
+    Returns:
+        tuple: 依傳入順序的mtime_ns (檔案不存在時為None)
+    """
+    versions = []
+    for project_name in project_names:
+        try:
+            versions.append(os.stat(f"data/{project_name}/config.json").st_mtime_ns)
+        except FileNotFoundError:
+            versions.append(None)
+    return tuple(versions)
+
+def load_all_project_configs():
+    """一次載入data目錄下所有專案的配置
+
+    Returns:
+        dict: {project_name: 唯讀配置}
+    """
+    return {
+        path.parent.name: load_project_config(path.parent.name)
+        for path in sorted(Path("data").glob("project*/config.json"))
+    }
 
 DEFAULT_CONFIG = {
     "metrics": {
@@ -20,7 +106,7 @@ DEFAULT_CONFIG = {
     },
     "weights": {
         "Pass_Rate(%)": 0.3,
-        "Open_Bugs": 0.2, 
+        "Open_Bugs": 0.2,
         "Critical_Bugs": 0.3,
         "Code_Coverage": 0.2
     },
@@ -31,7 +117,7 @@ def init_project_config(project_name):
     """初始化專案配置"""
     config_path = Path(f"data/{project_name}/config.json")
     config_path.parent.mkdir(exist_ok=True)
-    
+
     if not config_path.exists():
         with open(config_path, "w") as f:
             json.dump(DEFAULT_CONFIG, f, indent=2)
@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 from utils.project_config import load_project_config
 
@@ -44,6 +45,77 @@ def calculate_quality_score(project_name, metrics):
     
     return {'score': final_score, 'grade': 'E'}
 
+DEFAULT_GRADE_SCALE = {'A': 90, 'B': 80, 'C': 70, 'D': 60, 'E': 0}
+
+def calculate_quality_scores(df, configs=None):
+    """批次計算多個專案、多個日期的品質評分
+    
+    與calculate_quality_score使用相同的評分規則，但以欄位運算一次處理整個
+    sample_qa_dashboard DataFrame，不需對每個專案或每一列呼叫一次。
+    閾值、權重與方向依Project欄位對應到各專案的配置。
+    
+    Args:
+        df (pandas.DataFrame): 含Project欄位與各指標欄位的資料
+        configs (dict, optional): {project: config}，未提供時以load_project_config載入
+        
+    Returns:
+        pandas.DataFrame: 與df相同索引，包含score (float) 與 grade (str) 欄位；
+            沒有配置或沒有任何有效指標的列為 score=0, grade='N/A'
+    """
+    projects = df['Project'].astype(object)
+    if configs is None:
+        configs = {p: load_project_config(p) for p in projects.unique()}
+    configs = {p: c for p, c in configs.items() if c}
+    
+    metric_names = []
+    for config in configs.values():
+        for metric in config['metrics']:
+            if metric in df.columns and metric not in metric_names:
+                metric_names.append(metric)
+    
+    total_score = np.zeros(len(df))
+    valid_metrics = np.zeros(len(df), dtype=int)
+    for metric in metric_names:
+        # 每個專案的閾值/權重/方向展開成逐列陣列
+        props = {p: c['metrics'].get(metric) for p, c in configs.items()}
+        props = {p: v for p, v in props.items() if v is not None}
+        threshold = projects.map({p: float(v.get('threshold', 100)) for p, v in props.items()}).to_numpy(dtype=float)
+        higher_better = projects.map({p: bool(v.get('higher_better', True)) for p, v in props.items()}).to_numpy(dtype=object)
+        weight = projects.map({p: float(configs[p]['weights'].get(metric, 0)) for p in props}).to_numpy(dtype=float)
+        value = pd.to_numeric(df[metric], errors='coerce').to_numpy(dtype=float)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            normalized = np.where(
+                higher_better == True,
+                np.minimum(value / threshold, 1.5),
+                np.minimum(threshold / np.maximum(value, 1), 1.5)
+            )
+        valid = ~np.isnan(threshold) & ~np.isnan(value) & ~np.isnan(normalized)
+        valid &= ~((higher_better == True) & (threshold == 0))
+        total_score += np.where(valid, normalized * weight, 0)
+        valid_metrics += valid
+    
+    score = np.round(total_score * 100, 1)
+    # np.round先乘10再取整，接近 .x5 的值可能與內建round不同，這些列改用round以保持一致
+    near_tie = np.abs(np.abs(total_score * 100 - score) - 0.05) < 1e-9
+    score[near_tie] = [round(float(v), 1) for v in total_score[near_tie] * 100]
+    grade = np.full(len(df), 'N/A', dtype=object)
+    
+    # 依等級表分組 (通常所有專案共用同一份)
+    scales = {}
+    for p, c in configs.items():
+        scale = c.get('style_rules', {}).get('grade_scale', DEFAULT_GRADE_SCALE)
+        scales.setdefault(tuple(scale.items()), []).append(p)
+    for scale, scale_projects in scales.items():
+        rows = projects.isin(scale_projects).to_numpy()
+        conditions = [score >= min_score for _, min_score in scale]
+        grade[rows] = np.select(conditions, [g for g, _ in scale], default='E')[rows]
+    
+    no_score = valid_metrics == 0
+    score[no_score] = 0
+    grade[no_score] = 'N/A'
+    return pd.DataFrame({'score': score, 'grade': grade}, index=df.index)
+
 def get_style(value, threshold, higher_better):
     """獲取數值顯示樣式"""
     if higher_better:
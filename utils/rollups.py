@@ -0,0 +1,305 @@
+"""預先彙總的趨勢資料 (日/週/月)
+
+長時間範圍的趨勢圖若直接使用每日原始資料，傳送到瀏覽器的點數會隨歷史長度成長。
+此模組在資料匯入後預先計算三種解析度的彙總表並存放於
+data/.store/rollups/{kind}/{resolution}/{project}.parquet，
+儀表板再依所選時間跨度自動挑選解析度，讓每條曲線的點數維持在上限內。
+另將所有專案的每月模組覆蓋率合併為單一表 (module_coverage/portfolio.parquet)，
+供跨專案比較一次讀取。
+
+使用範例:
+    >>> sync_rollups()
+    >>> resolution = pick_resolution(start_date, end_date)
+    >>> df = read_rollup('qa', resolution, projects=['project1'])
+"""
+import json
+import logging
+import shutil
+import threading
+
+import pandas as pd
+
+from utils.data_store import KINDS, STORE_DIR, atomic_write, read_dataset, source_versions, store_lock
+from utils.downsampling import MAX_POINTS_PER_TRACE
+from utils.indexes import read_indexed
+
+ROLLUP_DIR = STORE_DIR / 'rollups'
+ROLLUP_MANIFEST_PATH = ROLLUP_DIR / 'manifest.json'
+
+# 解析度 -> (pandas period代碼, 顯示名稱)
+RESOLUTIONS = {
+    'daily': ('D', '日'),
+    'weekly': ('W-SUN', '週'),
+    'monthly': ('M', '月'),
+}
+
+_lock = threading.Lock()
+
+
+def pick_resolution(start_date, end_date, max_points=MAX_POINTS_PER_TRACE):
+    """依時間跨度挑選最細但點數不超過上限的解析度
+
+    Args:
+        start_date: 範圍開始日期
+        end_date: 範圍結束日期
+        max_points (int): 每條曲線的點數上限
+
+    Returns:
+        str: 'daily', 'weekly' 或 'monthly'
+    """
+    span_days = (pd.Timestamp(end_date) - pd.Timestamp(start_date)).days + 1
+    if span_days <= max_points:
+        return 'daily'
+    if span_days / 7 <= max_points:
+        return 'weekly'
+    return 'monthly'
+
+
+def period_start(dates, resolution):
+    """將日期對齊到所屬週期的第一天"""
+    code = RESOLUTIONS[resolution][0]
+    return dates.dt.to_period(code).dt.start_time
+
+
+def _rollup_qa(df, resolution):
+    """彙總sample_qa_dashboard資料
+
+    測試數量取總和並重新計算通過率；缺陷數與覆蓋率取週期平均。
+    """
+    df = df.assign(Date=period_start(df['Date'], resolution))
+    grouped = df.groupby(['Project', 'Date'], as_index=False, observed=True).agg({
+        'Test_Executed': 'sum',
+        'Test_Passed': 'sum',
+        'Test_Failed': 'sum',
+        'Open_Bugs': 'mean',
+        'Critical_Bugs': 'mean',
+        'Code_Coverage': 'mean',
+    })
+    grouped['Pass_Rate(%)'] = (grouped['Test_Passed'] / grouped['Test_Executed'] * 100).round(2)
+    grouped[['Open_Bugs', 'Critical_Bugs', 'Code_Coverage']] = (
+        grouped[['Open_Bugs', 'Critical_Bugs', 'Code_Coverage']].round(2)
+    )
+    return grouped.astype({
+        'Test_Executed': 'int32', 'Test_Passed': 'int32', 'Test_Failed': 'int32',
+        'Pass_Rate(%)': 'float32', 'Open_Bugs': 'float32', 'Critical_Bugs': 'float32',
+        'Code_Coverage': 'float32',
+    })
+
+
+def _rollup_module_coverage(df, resolution):
+    """彙總模組覆蓋率資料
+
+    行數取週期內每日平均，覆蓋率由平均行數重新計算 (即以行數加權)。
+    """
+    df = df.assign(date=period_start(df['date'], resolution))
+    grouped = df.groupby(['Project', 'module_name', 'date'], as_index=False, observed=True).agg({
+        'covered_line_number': 'mean',
+        'total_line_number': 'mean',
+    })
+    grouped['coverage_percentage'] = (
+        grouped['covered_line_number'] / grouped['total_line_number'] * 100
+    ).round(2)
+    return grouped.astype({
+        'covered_line_number': 'float32', 'total_line_number': 'float32',
+        'coverage_percentage': 'float32',
+    })
+
+
+# 建立彙總表的資料種類；preflight_wut的圖表由每日筆數 (preflight.counts_by_period) 彙總，不建立彙總表
+_BUILDERS = {
+    'qa': _rollup_qa,
+    'module_coverage': _rollup_module_coverage,
+}
+
+
+def _rollup_path(kind, resolution, project):
+    return ROLLUP_DIR / kind / resolution / f'{project}.parquet'
+
+
+# 所有專案每月模組覆蓋率合併成的單一表 (跨專案比較用)
+MODULE_PORTFOLIO_PATH = ROLLUP_DIR / 'module_coverage' / 'portfolio.parquet'
+
+
+def _load_rollup_manifest():
+    if not ROLLUP_MANIFEST_PATH.exists():
+        return {}
+    try:
+        with open(ROLLUP_MANIFEST_PATH, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_rollup_manifest(manifest):
+    def write(tmp_path):
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+
+    atomic_write(ROLLUP_MANIFEST_PATH, write)
+
+
+def build_rollups(kind, project):
+    """重建單一專案、單一資料種類的全部解析度彙總表"""
+    df = read_dataset(kind, projects=[project])
+    for resolution in RESOLUTIONS:
+        path = _rollup_path(kind, resolution, project)
+        if df is None:
+            if path.exists():
+                path.unlink()
+            continue
+        rollup = _BUILDERS[kind](df, resolution)
+        atomic_write(path, lambda tmp_path: rollup.to_parquet(tmp_path, index=False))
+
+
+def build_module_portfolio():
+    """將所有專案的每月模組覆蓋率彙總合併為單一Parquet檔
+
+    跨專案的模組覆蓋率比較只需讀取這一個檔案 (專案與模組以字典編碼儲存)，
+    不需逐一開啟每個專案的資料。
+    """
+    paths = sorted(_rollup_path('module_coverage', 'monthly', '*').parent.glob('*.parquet'))
+    if not paths:
+        if MODULE_PORTFOLIO_PATH.exists():
+            MODULE_PORTFOLIO_PATH.unlink()
+        return
+    df = pd.concat([pd.read_parquet(path) for path in paths], ignore_index=True)
+    df['Project'] = df['Project'].astype(str).astype('category')
+    df['module_name'] = df['module_name'].astype(str).astype('category')
+    atomic_write(MODULE_PORTFOLIO_PATH, lambda tmp_path: df.to_parquet(tmp_path, index=False))
+
+
+def read_module_portfolio(projects=None, date_range=None):
+    """讀取跨專案的每月模組覆蓋率表，專案與月份條件下推到Parquet讀取
+
+    Args:
+        projects (list, optional): 專案清單，None表示全部
+        date_range (tuple, optional): (start_date, end_date)；
+            起始日所屬月份到結束日之間的月份會被保留
+
+    Returns:
+        pandas.DataFrame or None: Project, module_name, date (月初),
+            covered_line_number, total_line_number, coverage_percentage；沒有此表時返回None
+    """
+    if not MODULE_PORTFOLIO_PATH.exists():
+        return None
+    filters = []
+    if projects is not None:
+        filters.append(('Project', 'in', list(projects)))
+    if date_range is not None:
+        start = period_start(pd.Series([pd.Timestamp(date_range[0])]), 'monthly').iloc[0]
+        filters += [('date', '>=', start), ('date', '<=', pd.Timestamp(date_range[1]))]
+    return pd.read_parquet(MODULE_PORTFOLIO_PATH, filters=filters or None)
+
+
+def sync_rollups():
+    """依來源雜湊增量更新彙總表，需在data_store.sync_store()之後呼叫
+
+    Returns:
+        list[tuple]: 本次重建的 (kind, project)
+    """
+    with _lock, store_lock():
+        return _sync_rollups()
+
+
+def _sync_rollups():
+    manifest = _load_rollup_manifest()
+    rebuilt = []
+    # 清除已不再建立彙總表的資料種類 (舊版儲存中的preflight_wut)
+    retired = [kind for kind in manifest if kind not in _BUILDERS]
+    for kind in retired:
+        shutil.rmtree(ROLLUP_DIR / kind, ignore_errors=True)
+        del manifest[kind]
+    for kind in _BUILDERS:
+        versions = source_versions(kind)
+        built = manifest.setdefault(kind, {})
+        for project, sha1 in versions.items():
+            if built.get(project) == sha1:
+                continue
+            build_rollups(kind, project)
+            built[project] = sha1
+            rebuilt.append((kind, project))
+        for project in [p for p in built if p not in versions]:
+            build_rollups(kind, project)
+            del built[project]
+            rebuilt.append((kind, project))
+
+    if rebuilt or retired:
+        _save_rollup_manifest(manifest)
+        logging.info(f"已重建rollup: {len(rebuilt)} 組")
+    if (any(kind == 'module_coverage' for kind, _ in rebuilt)
+            or (manifest.get('module_coverage') and not MODULE_PORTFOLIO_PATH.exists())):
+        build_module_portfolio()
+    return rebuilt
+
+
+def _partial_periods(date_range, resolution):
+    """找出日期範圍兩端未被完整涵蓋的週期
+
+    Returns:
+        dict: {週期起始日: (週期在範圍內的開始日, 結束日)}；每日解析度時為空
+    """
+    if resolution == 'daily':
+        return {}
+    start, end = (pd.Timestamp(value).normalize() for value in date_range)
+    partial = {}
+    for day in (start, end):
+        period = pd.Period(day, freq=RESOLUTIONS[resolution][0])
+        first, last = period.start_time.normalize(), period.end_time.normalize()
+        if first < start or last > end:
+            partial[first] = (max(first, start), min(last, end))
+    return partial
+
+
+def _rebuild_partial_periods(kind, resolution, df, projects, partial):
+    """以範圍內的每日資料重新彙總兩端不完整的週期，取代彙總表中的整期數值"""
+    date_column = KINDS[kind]['date_column']
+    pieces = [df[~df[date_column].isin(list(partial))]]
+    for start, end in partial.values():
+        raw = read_indexed(kind, list(projects), date_range=(start, end))
+        if raw is not None and len(raw) > 0:
+            raw = raw.assign(Project=raw['Project'].astype(str))
+            pieces.append(_BUILDERS[kind](raw, resolution))
+    keys = [column for column in ('Project', 'module_name') if column in df.columns] + [date_column]
+    return pd.concat(pieces, ignore_index=True).sort_values(keys, kind='stable')
+
+
+def read_rollup(kind, resolution, projects, date_range=None):
+    """讀取彙總表
+
+    週/月彙總時，日期範圍兩端只涵蓋部分天數的週期會以範圍內的每日資料重新彙總
+    (由記憶體內索引讀取)，圖表不會混入範圍外的數值；這些點的日期仍為週期起始日。
+
+    Args:
+        kind (str): 資料種類
+        resolution (str): 'daily', 'weekly' 或 'monthly'
+        projects (list): 專案清單
+        date_range (tuple, optional): (start_date, end_date)；
+            週期起始日落在 [start所屬週期, end] 內的資料會被保留
+
+    Returns:
+        pandas.DataFrame or None: 彙總資料，沒有任何彙總檔時返回None
+    """
+    if isinstance(projects, str):
+        projects = [projects]
+    date_column = KINDS[kind]['date_column']
+
+    frames = [
+        pd.read_parquet(_rollup_path(kind, resolution, project))
+        for project in projects
+        if _rollup_path(kind, resolution, project).exists()
+    ]
+    if not frames:
+        return None
+    df = pd.concat(frames, ignore_index=True)
+
+    if date_range is not None:
+        start = period_start(pd.Series([pd.Timestamp(date_range[0])]), resolution).iloc[0]
+        df = df[(df[date_column] >= start) & (df[date_column] <= pd.Timestamp(date_range[1]))]
+        partial = _partial_periods(date_range, resolution)
+        if partial:
+            df = _rebuild_partial_periods(kind, resolution, df, projects, partial)
+
+    df['Project'] = pd.Categorical(df['Project'], categories=[p for p in projects if p in set(df['Project'])])
+    if 'module_name' in df.columns:
+        df['module_name'] = df['module_name'].astype('category')
+    return df.reset_index(drop=True)
@@ -0,0 +1,54 @@
+"""資料檔案結構定義
+
+每種來源CSV的檔名、日期欄位與其固定格式、以及各欄位的精簡型別。
+匯入時依此宣告以固定格式解析日期 (不做格式推斷)，並在讀取CSV時直接套用型別。
+
+    - 計數使用int32、百分比使用float32、標籤欄位使用category
+    - date_format 為 strptime 格式；檔案不符合時才退回格式推斷並記錄警告
+"""
+
+SCHEMAS = {
+    'qa': {
+        'file': 'sample_qa_dashboard.csv',
+        'date_column': 'Date',
+        'date_format': '%Y-%m-%d',
+        'dtypes': {
+            'Test_Executed': 'int32',
+            'Test_Passed': 'int32',
+            'Test_Failed': 'int32',
+            'Pass_Rate(%)': 'float32',
+            'Open_Bugs': 'int32',
+            'Critical_Bugs': 'int32',
+            'Code_Coverage': 'float32',
+        },
+    },
+    'module_coverage': {
+        'file': 'module_coverage.csv',
+        'date_column': 'date',
+        'date_format': '%Y/%m/%d',
+        'dtypes': {
+            'module_name': 'category',
+            'covered_line_number': 'int32',
+            'total_line_number': 'int32',
+            'coverage_percentage': 'float32',
+        },
+    },
+    'preflight_wut': {
+        'file': 'preflight_wut_result.csv',
+        'date_column': 'date',
+        'date_format': '%Y/%m/%d',
+        'dtypes': {
+            'type': 'category',
+            'wut_fail_case': 'category',
+        },
+    },
+}
+
+
+def read_dtypes(kind):
+    """返回讀取CSV時可直接指定的型別 (category與浮點數；整數欄位可能含缺值，讀取後再轉換)"""
+    return {
+        column: dtype
+        for column, dtype in SCHEMAS[kind]['dtypes'].items()
+        if not dtype.startswith('int')
+    }
@@ -0,0 +1,170 @@
+"""專案摘要計算
+
+儀表板與HTTP API共用的計算: 每個專案的最新指標與品質評分、preflight筆數、
+品質指標時間序列、模組覆蓋率總計與跨專案模組覆蓋率。此模組不依賴Streamlit，只使用
+data_store/rollups讀取資料。
+
+使用範例:
+    >>> summaries = project_summaries(['project1', 'project2'], (start, end))
+    >>> series = quality_timeseries(['project1'], (start, end), 'weekly')
+"""
+import pandas as pd
+
+from utils.data_store import read_dataset
+from utils.indexes import project_date_index, read_indexed
+from utils.preflight import COUNT_COLUMNS, aggregate_preflight, preflight_totals
+from utils.project_config import load_project_config
+from utils.quality_metrics import calculate_quality_scores
+from utils.rollups import read_module_portfolio, read_rollup
+
+# 概覽使用的品質指標欄位
+SUMMARY_METRICS = [
+    'Test_Executed', 'Test_Passed', 'Pass_Rate(%)', 'Open_Bugs', 'Critical_Bugs', 'Code_Coverage'
+]
+
+
+def coverage_totals(module_df):
+    """加總每天所有模組的行數並計算總覆蓋率
+
+    Returns:
+        pandas.DataFrame: date, covered_line_number, total_line_number, total_coverage
+    """
+    totals = module_df.groupby('date').agg({
+        'covered_line_number': 'sum',
+        'total_line_number': 'sum'
+    }).reset_index()
+    totals['total_coverage'] = (totals['covered_line_number'] / totals['total_line_number'] * 100).round(2)
+    return totals
+
+
+def _value(value):
+    """轉為可JSON序列化的Python值 (缺值為None，浮點數取4位小數)"""
+    if value is None or pd.isna(value):
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.strftime('%Y-%m-%d')
+    if hasattr(value, 'item'):
+        value = value.item()
+    if isinstance(value, float):
+        return round(value, 4)
+    return value
+
+
+def frame_records(df):
+    """將DataFrame轉為JSON友善的records清單"""
+    return [
+        {column: _value(value) for column, value in zip(df.columns, row)}
+        for row in df.itertuples(index=False, name=None)
+    ]
+
+
+def project_summaries(projects, date_range=None):
+    """計算每個專案在日期範圍內的最新指標、品質評分與preflight筆數
+
+    Args:
+        projects (list): 專案清單
+        date_range (tuple, optional): (start_date, end_date)
+
+    Returns:
+        list[dict]: 每個專案一筆，沒有資料的專案score為0、grade為'N/A'
+    """
+    latest = project_date_index('qa').latest(projects, *(date_range or (None, None)))
+    configs = {project: load_project_config(project) for project in projects}
+    scores = calculate_quality_scores(latest, configs)
+    scores.index = latest['Project']
+    latest = latest.set_index(latest['Project'])
+
+    preflight_df = read_indexed('preflight_wut', projects, columns=['date', 'type'], date_range=date_range)
+    totals = preflight_totals(aggregate_preflight(preflight_df)) if preflight_df is not None else None
+
+    summaries = []
+    for project in projects:
+        config = configs.get(project) or {}
+        entry = {
+            'project': project,
+            'latest_date': None,
+            'metrics': {metric: None for metric in SUMMARY_METRICS},
+            'score': 0,
+            'grade': 'N/A',
+            'preflight': None,
+            'description': config.get('description') or None,
+        }
+        if project in latest.index:
+            row = latest.loc[project]
+            entry['latest_date'] = _value(row['Date'])
+            entry['metrics'] = {metric: _value(row.get(metric)) for metric in SUMMARY_METRICS}
+            entry['score'] = _value(scores.loc[project, 'score'])
+            entry['grade'] = scores.loc[project, 'grade']
+        if totals is not None:
+            if project in totals.index:
+                entry['preflight'] = {column: int(totals.loc[project, column]) for column in COUNT_COLUMNS}
+            else:
+                entry['preflight'] = {column: 0 for column in COUNT_COLUMNS}
+        summaries.append(entry)
+    return summaries
+
+
+def quality_timeseries(projects, date_range, resolution='daily'):
+    """品質指標與品質評分的時間序列
+
+    Args:
+        projects (list): 專案清單
+        date_range (tuple): (start_date, end_date)
+        resolution (str): 'daily', 'weekly' 或 'monthly'
+
+    Returns:
+        pandas.DataFrame or None: Project, Date, 各指標, score, grade
+    """
+    df = read_rollup('qa', resolution, projects, date_range)
+    if df is None:
+        df = read_dataset('qa', projects, date_range=date_range)
+    if df is None:
+        return None
+    configs = {project: load_project_config(project) for project in projects}
+    df = df.join(calculate_quality_scores(df, configs))
+    return df.sort_values(['Project', 'Date']).reset_index(drop=True)
+
+
+def module_coverage_series(project, date_range, resolution='daily'):
+    """單一專案各模組的覆蓋率時間序列與每期總覆蓋率
+
+    Returns:
+        tuple: (模組資料DataFrame, 總覆蓋率DataFrame)；沒有資料時為 (None, None)
+    """
+    df = read_rollup('module_coverage', resolution, [project], date_range)
+    if df is None or len(df) == 0:
+        return None, None
+    df = df.sort_values(['module_name', 'date']).reset_index(drop=True)
+    return df, coverage_totals(df)
+
+
+def portfolio_module_coverage(projects, date_range=None):
+    """每個 (專案, 模組) 在日期範圍內的平均覆蓋率
+
+    由跨專案的每月彙總表 (rollups.read_module_portfolio) 一次讀取，
+    行數取各月平均後重新計算覆蓋率 (即以行數加權)。
+
+    Args:
+        projects (list): 專案清單
+        date_range (tuple, optional): (start_date, end_date)，以月份為單位
+
+    Returns:
+        pandas.DataFrame or None: Project, module_name, covered_line_number,
+            total_line_number, coverage_percentage；沒有彙總表時返回None
+    """
+    df = read_module_portfolio(projects, date_range)
+    if df is None:
+        return None
+    coverage = df.groupby(['Project', 'module_name'], as_index=False, observed=True).agg({
+        'covered_line_number': 'mean',
+        'total_line_number': 'mean'
+    })
+    coverage['coverage_percentage'] = (
+        coverage['covered_line_number'] / coverage['total_line_number'] * 100
+    ).round(2)
+    return coverage
+
+
+def worst_modules(coverage, n=10):
+    """返回覆蓋率最低的n個 (專案, 模組)，依覆蓋率由低到高排列"""
+    return coverage.nsmallest(n, 'coverage_percentage').reset_index(drop=True)
@@ -0,0 +1,141 @@
+"""分頁表格的伺服器端排序、篩選與分頁
+
+排序結果以「位置索引陣列」表示，不複製DataFrame本身；篩選只產生布林遮罩，
+再以遮罩過濾已排序的索引，因此篩選後仍保持排序。每次只將目前頁面的資料列
+取出並傳送到瀏覽器。
+
+使用範例:
+    >>> order = sort_order(df, ['Project', 'Date'])
+    >>> order = apply_filter(df, order, 'Pass_Rate(%)', '>=90')
+    >>> page_df = page_rows(df, order, page=1, page_size=50)
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+PAGE_SIZES = (25, 50, 100, 200)
+
+# 數值篩選語法: ">=90"、"<5"、"=3"、"80..95"
+_COMPARE_PATTERN = re.compile(r'^(>=|<=|>|<|=|==|!=)?\s*(-?\d+(?:\.\d+)?)$')
+_RANGE_PATTERN = re.compile(r'^(-?\d+(?:\.\d+)?)\s*\.\.\s*(-?\d+(?:\.\d+)?)$')
+
+
+def sort_order(df, columns, ascending=True):
+    """計算排序後的位置索引 (穩定排序)
+
+    Args:
+        df (pandas.DataFrame): 原始資料
+        columns (str or list): 排序欄位，第一個為主要排序鍵
+        ascending (bool): 是否遞增
+
+    Returns:
+        numpy.ndarray: 依排序排列的位置索引
+    """
+    if isinstance(columns, str):
+        columns = [columns]
+    keys = []
+    for column in columns:
+        values = df[column]
+        if values.dtype == 'category':
+            # 類別欄位依類別名稱排序，而非類別代碼
+            ranks = values.cat.categories.argsort().argsort()
+            codes = values.cat.codes.to_numpy()
+            keys.append(np.where(codes >= 0, ranks[codes], len(ranks)))
+        else:
+            keys.append(values.to_numpy())
+    # np.lexsort以最後一個鍵為主要排序鍵
+    order = np.lexsort(keys[::-1])
+    if not ascending:
+        # 反轉後相同鍵的資料列仍維持原始順序
+        order = _stable_reverse(keys, order[::-1])
+    return order
+
+
+def _stable_reverse(keys, order):
+    """反轉排序時，讓排序鍵相同的資料列保持原始相對順序"""
+    if len(order) < 2:
+        return order
+    same = np.ones(len(order) - 1, dtype=bool)
+    for key in keys:
+        ordered = np.asarray(key)[order]
+        same &= ordered[1:] == ordered[:-1]
+    group_ids = np.concatenate([[0], np.cumsum(~same)])
+    return order[np.lexsort((order, group_ids))]
+
+
+def filter_mask(df, column, query):
+    """依篩選條件產生布林遮罩
+
+    數值欄位支援比較 (">=90"、"<5"、"=3"、"!=0") 與區間 ("80..95")；
+    日期欄位支援日期前綴 (例如 "2024-03")；其他欄位為不分大小寫的包含比對。
+
+    Args:
+        df (pandas.DataFrame): 原始資料
+        column (str): 篩選欄位
+        query (str): 篩選條件，空字串表示不篩選
+
+    Returns:
+        numpy.ndarray or None: 布林遮罩；不篩選時返回None
+
+    Raises:
+        ValueError: 數值欄位的篩選條件格式錯誤
+    """
+    query = (query or '').strip()
+    if not query:
+        return None
+    values = df[column]
+
+    if pd.api.types.is_numeric_dtype(values):
+        match = _RANGE_PATTERN.match(query)
+        if match:
+            low, high = float(match.group(1)), float(match.group(2))
+            return ((values >= low) & (values <= high)).to_numpy()
+        match = _COMPARE_PATTERN.match(query)
+        if not match:
+            raise ValueError(f"無法解析數值篩選條件: {query}")
+        op, number = match.group(1) or '=', float(match.group(2))
+        compare = {
+            '>=': values.__ge__, '<=': values.__le__, '>': values.__gt__,
+            '<': values.__lt__, '=': values.__eq__, '==': values.__eq__, '!=': values.__ne__,
+        }[op]
+        return compare(number).to_numpy()
+
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values.dt.strftime('%Y-%m-%d').str.startswith(query).to_numpy()
+
+    if values.dtype == 'category':
+        # 只比對類別名稱一次，再以類別代碼展開
+        hits = values.cat.categories.astype(str).str.contains(query, case=False, regex=False)
+        codes = values.cat.codes.to_numpy()
+        return np.where(codes >= 0, np.asarray(hits)[codes], False)
+    return values.astype(str).str.contains(query, case=False, regex=False).to_numpy()
+
+
+def apply_filter(df, order, column, query):
+    """以篩選條件過濾已排序的位置索引，保持排序"""
+    mask = filter_mask(df, column, query)
+    if mask is None:
+        return order
+    return order[mask[order]]
+
+
+def page_count(total_rows, page_size):
+    """回傳總頁數 (至少1頁)"""
+    return max(1, -(-total_rows // page_size))
+
+
+def page_rows(df, order, page, page_size):
+    """取出指定頁面的資料列
+
+    Args:
+        df (pandas.DataFrame): 原始資料
+        order (numpy.ndarray): 排序 (及篩選) 後的位置索引
+        page (int): 頁碼，從1開始
+        page_size (int): 每頁列數
+
+    Returns:
+        pandas.DataFrame: 該頁的資料列
+    """
+    start = (page - 1) * page_size
+    return df.iloc[order[start:start + page_size]]